@@ -0,0 +1,182 @@
+import re
+import time
+from collections import namedtuple
+
+from db import quote_ident
+from query_runner import MAX_ROWS, QUERY_TIMEOUT_S, run_guarded
+from schema_catalog import virtual_names
+
+# --- Index Advisor ---
+# Reads EXPLAIN QUERY PLAN output, flags full table scans and automatic
+# (temporary) indexes, and proposes CREATE INDEX statements from the columns
+# the query filters, joins or sorts on.
+PlanStep = namedtuple("PlanStep", ["id", "parent", "detail", "flag"])
+IndexSuggestion = namedtuple("IndexSuggestion", ["table", "columns", "sql", "reason"])
+
+# "SCAN <name>" is a full scan only when <name> resolves to an ordinary table;
+# CONSTANT ROW, (subquery-N), CTE names and virtual tables are left alone
+_SCAN = re.compile(r"^SCAN (\S+)(?!\S)(?! USING (?:COVERING )?INDEX| VIRTUAL TABLE)")
+_AUTO_INDEX = re.compile(r"^SEARCH (\S+) USING AUTOMATIC (?:COVERING |PARTIAL )?INDEX \((.*)\)")
+_TEMP_BTREE = re.compile(r"^USE TEMP B-TREE FOR (ORDER BY|GROUP BY|DISTINCT)")
+
+_IDENT = r'(?:"(?:[^"]|"")+"|`[^`]+`|\[[^\]]+\]|\w+)'
+_TABLE_REF = re.compile(rf"\b(?:FROM|JOIN)\s+({_IDENT})(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_EQ_LEFT = re.compile(rf"(?:({_IDENT})\.)?({_IDENT})\s*(?:==?|\bIN\b|\bIS\b(?!\s+NOT))", re.IGNORECASE)
+_EQ_RIGHT = re.compile(rf"==?\s*(?:({_IDENT})\.)?({_IDENT})", re.IGNORECASE)
+_RANGE_PREDICATE = re.compile(rf"(?:({_IDENT})\.)?({_IDENT})\s*(?:<=|>=|<|>|\bBETWEEN\b)", re.IGNORECASE)
+_ORDER_CLAUSE = re.compile(r"\b(?:ORDER|GROUP)\s+BY\s+(.*?)(?:\bLIMIT\b|\bHAVING\b|\bORDER\b|$)",
+                           re.IGNORECASE | re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NOT_ALIASES = {"where", "join", "on", "left", "right", "inner", "outer", "cross", "natural", "full",
+                "group", "order", "limit", "using", "union", "except", "intersect", "having", "window"}
+
+
+def _unquote(name):
+    if name and name[0] in '"`[':
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def query_plan(conn, sql, catalog=None):
+    aliases = None
+    steps = []
+    for step_id, parent, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall():
+        scan = _SCAN.match(detail)
+        if scan and aliases is None:
+            aliases = _table_aliases(conn, sql, catalog)
+        if scan and scan.group(1).lower() in aliases:
+            flag = "full scan"
+        elif _AUTO_INDEX.match(detail):
+            flag = "automatic index"
+        elif _TEMP_BTREE.match(detail):
+            flag = "temp b-tree"
+        else:
+            flag = None
+        steps.append(PlanStep(step_id, parent, detail, flag))
+    return steps
+
+
+def _table_aliases(conn, sql, catalog=None):
+    """Map every name the plan may use (table or alias) to its real, indexable table."""
+    if catalog is not None:
+        virtual = catalog.virtual_tables(conn)
+        names = [n for n in catalog.table_names(conn, include_internal=True) if n not in virtual]
+    else:
+        rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table'").fetchall()
+        virtual = virtual_names(rows)
+        names = [name for name, _ in rows if name not in virtual]
+    tables = {name.lower(): name for name in names}
+    aliases = {}
+    for name, alias in _TABLE_REF.findall(sql):
+        table = tables.get(_unquote(name).lower())
+        if table is None:
+            continue
+        aliases[table.lower()] = table
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases[alias.lower()] = table
+    return aliases
+
+
+def _index_columns(conn, table, catalog=None):
+    if catalog is not None:
+        info = catalog.table(conn, table)
+        return [index.columns for index in info.indexes] if info else []
+    return [[c[2] for c in conn.execute(f"PRAGMA index_info({quote_ident(index[1])})")]
+            for index in conn.execute(f"PRAGMA index_list({quote_ident(table)})").fetchall()]
+
+
+def _existing_index_prefixes(conn, table, catalog=None):
+    prefixes = set()
+    for columns in _index_columns(conn, table, catalog):
+        for n in range(1, len(columns) + 1):
+            prefixes.add(tuple(c.lower() for c in columns[:n] if c))
+    return prefixes
+
+
+def _columns_for(matches, names, columns):
+    found = []
+    for qualifier, column in matches:
+        column = _unquote(column).lower()
+        if column in columns and (not qualifier or _unquote(qualifier).lower() in names):
+            if columns[column] not in found:
+                found.append(columns[column])
+    return found
+
+
+def _suggest_for_table(conn, sql, table, aliases, catalog=None):
+    names = {n for n, t in aliases.items() if t == table}
+    if catalog is not None:
+        columns = {c.name.lower(): c.name for c in catalog.columns(conn, table)}
+    else:
+        columns = {c[1].lower(): c[1] for c in conn.execute(f"PRAGMA table_info({quote_ident(table)})")}
+    body = _STRING.sub("?", sql)
+
+    equality = _columns_for(_EQ_LEFT.findall(body) + _EQ_RIGHT.findall(body), names, columns)
+    ranged = [c for c in _columns_for(_RANGE_PREDICATE.findall(body), names, columns) if c not in equality]
+    if equality or ranged:
+        return equality + ranged[:1], "filter/join columns"
+
+    order = _ORDER_CLAUSE.search(body)
+    if order:
+        refs = re.findall(rf"(?:({_IDENT})\.)?({_IDENT})", order.group(1))
+        sort_columns = _columns_for(refs, names, columns)
+        if sort_columns:
+            return sort_columns, "ORDER BY/GROUP BY columns"
+    return [], None
+
+
+def suggest_indexes(conn, sql, plan=None, catalog=None):
+    """Propose CREATE INDEX statements for the scans in ``sql``'s plan.
+
+    Equality predicates lead the index, followed by at most one range
+    column; sort/group columns are used only when nothing is filtered.
+    Suggestions already covered by an existing index prefix are skipped.
+    Table, column and index lookups go through ``catalog`` when one is given.
+    """
+    plan = plan if plan is not None else query_plan(conn, sql, catalog)
+    aliases = _table_aliases(conn, sql, catalog)
+    suggestions = []
+
+    for step in plan:
+        auto = _AUTO_INDEX.match(step.detail)
+        scan = _SCAN.match(step.detail)
+        if auto:
+            table = aliases.get(auto.group(1).lower())
+            cols = [c.split("=")[0].strip() for c in auto.group(2).split(" AND ")]
+            reason = "replaces the automatic index SQLite builds on every run"
+        elif scan:
+            table = aliases.get(scan.group(1).lower())
+            cols, reason = _suggest_for_table(conn, sql, table, aliases, catalog) if table else ([], None)
+        else:
+            continue
+        if not table or not cols:
+            continue
+        if tuple(c.lower() for c in cols) in _existing_index_prefixes(conn, table, catalog):
+            continue
+        if any(s.table == table and s.columns == cols for s in suggestions):
+            continue
+        index_name = quote_ident(f"idx_{table}_{'_'.join(cols)}")
+        column_list = ", ".join(quote_ident(c) for c in cols)
+        create_sql = f"CREATE INDEX IF NOT EXISTS {index_name} ON {quote_ident(table)} ({column_list})"
+        suggestions.append(IndexSuggestion(table, cols, create_sql, reason))
+    return suggestions
+
+
+def time_query(conn, sql, repeat=3, timeout_s=QUERY_TIMEOUT_S, max_rows=MAX_ROWS):
+    """Best-of-``repeat`` wall time in milliseconds to run ``sql``, or None if it overran.
+
+    The runs share one ``timeout_s`` budget and go through run_guarded, so at
+    most ``max_rows`` rows are fetched; None means the budget ran out before
+    a run finished. Pass ``timeout_s=None, max_rows=None`` to time full reads.
+    """
+    deadline = time.monotonic() + timeout_s if timeout_s is not None else None
+    best = None
+    for _ in range(repeat):
+        remaining = deadline - time.monotonic() if deadline is not None else None
+        if remaining is not None and remaining <= 0:
+            return best
+        result = run_guarded(conn, sql, remaining, max_rows)
+        if result.stopped:
+            return best
+        best = result.elapsed * 1000 if best is None else min(best, result.elapsed * 1000)
+    return best
@@ -0,0 +1,246 @@
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+from db import quote_ident
+
+# --- Materialized Analytics ---
+# Summary tables over CategoryAI for the Analytics page. Triggers only record
+# which categories changed (app_mv_dirty); a refresh recomputes the summaries
+# for those categories alone, so its cost follows the size of the change, and
+# the charts read a few hundred summary rows however large CategoryAI grows.
+# Refreshes run on a schedule (the interval is stored in app_mv_meta) from a
+# background thread, or on demand. Rows with a NULL category are not summarized.
+SOURCE_TABLE = "CategoryAI"
+REFRESH_INTERVAL_S = 60
+SCHEDULER_POLL_S = 5
+# Best tools kept per category; the overall top N is read from their union
+TOP_PER_CATEGORY = 25
+
+MV_SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_mv_category (
+    category TEXT PRIMARY KEY,
+    tools INTEGER NOT NULL,
+    rated INTEGER NOT NULL,
+    mean_rating REAL,
+    total_upvotes INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS app_mv_category_tier (
+    category TEXT NOT NULL,
+    tier TEXT,
+    tools INTEGER NOT NULL,
+    PRIMARY KEY (category, tier)
+);
+CREATE TABLE IF NOT EXISTS app_mv_top_upvoted (
+    category TEXT NOT NULL,
+    place INTEGER NOT NULL,
+    title TEXT,
+    tool_url TEXT,
+    tier TEXT,
+    upvotes INTEGER,
+    PRIMARY KEY (category, place)
+);
+CREATE INDEX IF NOT EXISTS app_mv_top_upvoted_upvotes ON app_mv_top_upvoted (upvotes DESC);
+CREATE TABLE IF NOT EXISTS app_mv_dirty (
+    category TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS app_mv_meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+_TRIGGERS = ("app_mv_ins", "app_mv_del", "app_mv_upd")
+_SUMMARY_TABLES = ("app_mv_category", "app_mv_category_tier", "app_mv_top_upvoted")
+_DIRTY = "category IN (SELECT category FROM app_mv_dirty)"
+
+
+def _meta(conn, key, default=None):
+    try:
+        row = conn.execute("SELECT value FROM app_mv_meta WHERE key = ?", (key,)).fetchone()
+    except sqlite3.OperationalError:
+        return default  # summaries not installed yet
+    return row[0] if row else default
+
+
+def _set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO app_mv_meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _source_exists(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?", (SOURCE_TABLE,)
+    ).fetchone() is not None
+
+
+def needs_install(conn):
+    """True when the change triggers are missing, e.g. after CategoryAI was replaced."""
+    if not _source_exists(conn):
+        return False
+    placeholders = ", ".join("?" * len(_TRIGGERS))
+    found = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({placeholders})", _TRIGGERS
+    ).fetchone()[0]
+    return found < len(_TRIGGERS)
+
+
+def refresh_interval(conn):
+    return float(_meta(conn, "refresh_interval_s", REFRESH_INTERVAL_S))
+
+
+def set_refresh_interval(conn, seconds):
+    conn.executescript(MV_SCHEMA)
+    _set_meta(conn, "refresh_interval_s", float(seconds))
+
+
+def refresh_due(conn):
+    if needs_install(conn):
+        return True
+    try:
+        pending = conn.execute("SELECT EXISTS (SELECT 1 FROM app_mv_dirty)").fetchone()[0]
+    except sqlite3.OperationalError:
+        return False
+    last = _meta(conn, "refreshed_at", 0) or 0
+    return bool(pending) and time.time() - last >= refresh_interval(conn)
+
+
+def install(conn):
+    """Create the summary tables and change triggers, then mark every category dirty.
+
+    Must run on a writable connection; the next ``refresh`` does the full build.
+    """
+    conn.executescript(MV_SCHEMA)
+    name = quote_ident(SOURCE_TABLE)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_mv_ins AFTER INSERT ON {name}
+        BEGIN
+            INSERT OR IGNORE INTO app_mv_dirty (category) VALUES (NEW.category);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_mv_del AFTER DELETE ON {name}
+        BEGIN
+            INSERT OR IGNORE INTO app_mv_dirty (category) VALUES (OLD.category);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_mv_upd
+        AFTER UPDATE OF category, tier, rating_score, upvotes, title, tool_url ON {name}
+        BEGIN
+            INSERT OR IGNORE INTO app_mv_dirty (category) VALUES (OLD.category);
+            INSERT OR IGNORE INTO app_mv_dirty (category) VALUES (NEW.category);
+        END""")
+    for table in _SUMMARY_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+    conn.execute(f"INSERT OR IGNORE INTO app_mv_dirty (category) SELECT DISTINCT category FROM {name}")
+
+
+def refresh(conn):
+    """Recompute the summaries for every dirty category; returns how many were refreshed.
+
+    Must run on a writable connection, inside one transaction so readers see
+    either the old or the new summaries.
+    """
+    started = time.perf_counter()
+    if needs_install(conn):
+        install(conn)
+    if not _source_exists(conn):
+        return 0
+    name = quote_ident(SOURCE_TABLE)
+    dirty = conn.execute("SELECT COUNT(*) FROM app_mv_dirty").fetchone()[0]
+
+    for table in _SUMMARY_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE {_DIRTY}")
+    conn.execute(f"""
+        INSERT INTO app_mv_category (category, tools, rated, mean_rating, total_upvotes)
+        SELECT category, COUNT(*), COUNT(rating_score), AVG(rating_score), TOTAL(upvotes)
+        FROM {name} WHERE {_DIRTY} GROUP BY category""")
+    conn.execute(f"""
+        INSERT INTO app_mv_category_tier (category, tier, tools)
+        SELECT category, tier, COUNT(*) FROM {name} WHERE {_DIRTY} GROUP BY category, tier""")
+    conn.execute(f"""
+        INSERT INTO app_mv_top_upvoted (category, place, title, tool_url, tier, upvotes)
+        SELECT category, place, title, tool_url, tier, upvotes FROM (
+            SELECT category, title, tool_url, tier, upvotes,
+                   ROW_NUMBER() OVER (PARTITION BY category ORDER BY upvotes DESC, rank) AS place
+            FROM {name} WHERE {_DIRTY}
+        ) WHERE place <= ?""", (TOP_PER_CATEGORY,))
+    conn.execute("DELETE FROM app_mv_dirty")
+
+    _set_meta(conn, "refreshed_at", time.time())
+    _set_meta(conn, "last_refresh_ms", (time.perf_counter() - started) * 1000)
+    _set_meta(conn, "last_refresh_categories", dirty)
+    return dirty
+
+
+def refresh_if_due(pool, force=False):
+    """Refresh through ``pool``'s writer when forced or the schedule says so."""
+    with pool.reader() as conn:
+        due = force or refresh_due(conn)
+    if not due:
+        return None
+    with pool.writer() as conn:
+        return refresh(conn)
+
+
+def refresh_status(conn):
+    try:
+        pending = conn.execute("SELECT COUNT(*) FROM app_mv_dirty").fetchone()[0]
+    except sqlite3.OperationalError:
+        pending = None
+    return {
+        "refreshed_at": _meta(conn, "refreshed_at"),
+        "last_refresh_ms": _meta(conn, "last_refresh_ms"),
+        "last_refresh_categories": _meta(conn, "last_refresh_categories"),
+        "interval_s": refresh_interval(conn),
+        "pending_categories": pending,
+    }
+
+
+def category_summary(conn):
+    return conn.execute(
+        "SELECT category, tools, rated, mean_rating, total_upvotes FROM app_mv_category ORDER BY category"
+    ).fetchall()
+
+
+def tier_counts(conn):
+    return conn.execute("SELECT category, tier, tools FROM app_mv_category_tier").fetchall()
+
+
+def top_upvoted(conn, n=10):
+    n = min(n, TOP_PER_CATEGORY)
+    return conn.execute(
+        "SELECT title, category, tier, upvotes, tool_url FROM app_mv_top_upvoted "
+        "ORDER BY upvotes DESC LIMIT ?", (n,)
+    ).fetchall()
+
+
+class RefreshScheduler:
+    """Daemon thread that refreshes the summaries whenever a refresh falls due."""
+
+    def __init__(self, pool, poll_s=SCHEDULER_POLL_S):
+        self.pool = pool
+        self.poll_s = poll_s
+        self.runs = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="mv-refresh", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_s):
+            try:
+                if refresh_if_due(self.pool) is not None:
+                    self.runs += 1
+                self.last_error = None
+            except sqlite3.Error as e:
+                self.last_error = e
+
+    def stop(self):
+        self._stop.set()
+
+
+@st.cache_resource(show_spinner=False)
+def get_refresh_scheduler(path, _pool):
+    """The scheduler refreshing the database file at ``path`` through ``_pool``."""
+    return RefreshScheduler(_pool)
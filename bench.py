@@ -0,0 +1,295 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from analytics import category_summary, refresh, top_upvoted
+from cdc import sync_csv, sync_rows
+from db import DB_PATH, quote_ident
+from ingest import TABLE_SCHEMAS, ingest_csv, load_rows
+from paging import fetch_page
+from similar import SimilarIndex, install_similar_triggers
+from stats import rating_counts, sync_stats, table_row_counts
+
+# --- Benchmark Settings ---
+SOURCE_TABLE = "CategoryAI"
+DEFAULT_SCALES = [10, 100]
+DEFAULT_REPEAT = 20
+REGRESSION_THRESHOLD = 0.20
+# Rank offset per synthetic copy keeps the (category, rank) primary key unique
+RANK_STRIDE = 1_000_000
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def measure(fn, repeat, work=1):
+    """Time ``fn`` ``repeat`` times, then once more under tracemalloc for peak memory.
+
+    ``work`` is the number of units (rows, operations) one call processes and
+    is used for the throughput figure.
+    """
+    fn()  # warm the page cache and statement cache
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean = sum(durations) / len(durations)
+    return {
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "throughput": work / mean if mean else None,
+        "peak_mem_kb": peak / 1024,
+    }
+
+
+def source_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = [name for name, _ in TABLE_SCHEMAS[SOURCE_TABLE].columns]
+        column_list = ", ".join(quote_ident(c) for c in columns)
+        rows = conn.execute(f"SELECT {column_list} FROM {quote_ident(SOURCE_TABLE)}").fetchall()
+    finally:
+        conn.close()
+    return columns, rows
+
+
+def synthetic_rows(columns, rows, scale):
+    rank_index = columns.index("rank")
+    for copy in range(scale):
+        for row in rows:
+            row = list(row)
+            row[rank_index] = (row[rank_index] or 0) + copy * RANK_STRIDE
+            yield tuple(row)
+
+
+def build_dataset(path, columns, rows, scale):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        load_rows(conn, SOURCE_TABLE, columns, synthetic_rows(columns, rows, scale), mode="replace")
+    return conn
+
+
+def write_csv(path, columns, rows, scale):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(synthetic_rows(columns, rows, scale))
+
+
+def bench_scale(columns, rows, scale, repeat, workdir):
+    results = []
+    row_count = len(rows) * scale
+
+    def record(name, stats, unit):
+        results.append({"name": name, "scale": scale, "rows": row_count, "throughput_unit": unit, **stats})
+        print(f"  {name:<24} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+              f"{stats['throughput']:12,.1f} {unit}  peak {stats['peak_mem_kb']:9,.0f} KiB")
+
+    print(f"Scale {scale}x ({row_count:,} rows)")
+    db_path = os.path.join(workdir, f"bench_{scale}x.db")
+    conn = build_dataset(db_path, columns, rows, scale)
+    try:
+        table = quote_ident(SOURCE_TABLE)
+        max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0]
+
+        record("table_list", measure(
+            lambda: conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall(), repeat
+        ), "ops/s")
+        record("preview_first_page", measure(
+            lambda: fetch_page(conn, SOURCE_TABLE, 100), repeat, work=100
+        ), "rows/s")
+        record("preview_deep_page", measure(
+            lambda: fetch_page(conn, SOURCE_TABLE, 100, anchor=max_rowid // 2), repeat, work=100
+        ), "rows/s")
+        record("count_loop", measure(
+            lambda: [conn.execute(f"SELECT COUNT(*) FROM {quote_ident(t)}").fetchone()
+                     for (t,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()],
+            repeat,
+        ), "ops/s")
+        record("rating_group_by", measure(
+            lambda: conn.execute(f"SELECT rating_stars, COUNT(*) FROM {table} GROUP BY rating_stars").fetchall(),
+            repeat,
+        ), "ops/s")
+
+        with conn:
+            sync_stats(conn)
+        # The same reads against an in-memory snapshot, as served in read-replica mode
+        def snapshot():
+            replica = sqlite3.connect(f"file:bench-replica-{scale}?mode=memory&cache=shared", uri=True)
+            conn.backup(replica)
+            return replica
+
+        record("replica_sync", measure(lambda: snapshot().close(), max(1, min(repeat, 5)), work=row_count), "rows/s")
+        replica = snapshot()
+        try:
+            record("replica_deep_page", measure(
+                lambda: fetch_page(replica, SOURCE_TABLE, 100, anchor=max_rowid // 2), repeat, work=100
+            ), "rows/s")
+            record("replica_rating_group_by", measure(
+                lambda: replica.execute(f"SELECT rating_stars, COUNT(*) FROM {table} GROUP BY rating_stars").fetchall(),
+                repeat,
+            ), "ops/s")
+        finally:
+            replica.close()
+
+        record("stats_row_counts", measure(lambda: table_row_counts(conn), repeat), "ops/s")
+        record("stats_rating_counts", measure(lambda: rating_counts(conn), repeat), "ops/s")
+
+        with conn:
+            refresh(conn)
+        record("mv_category_summary", measure(
+            lambda: (category_summary(conn), top_upvoted(conn, 10)), repeat
+        ), "ops/s")
+
+        def touch_and_refresh():
+            with conn:
+                conn.execute(f"UPDATE {table} SET upvotes = upvotes + 1 WHERE rowid = 1")
+                refresh(conn)
+        record("mv_incremental_refresh", measure(touch_and_refresh, repeat), "ops/s")
+
+        with conn:
+            install_similar_triggers(conn)
+
+        def similar_build():
+            index = SimilarIndex()
+            index.sync(conn)
+            return index
+        record("similar_full_build", measure(similar_build, max(1, min(repeat, 3)), work=row_count), "rows/s")
+        similar_index = similar_build()
+        record("similar_top_k", measure(lambda: similar_index.similar(max_rowid // 2), repeat), "ops/s")
+
+        def touch_and_sync():
+            with conn:
+                conn.execute(f"UPDATE {table} SET description = description || '.' WHERE rowid = 1")
+            similar_index.sync(conn)
+        record("similar_incremental_sync", measure(touch_and_sync, repeat), "ops/s")
+    finally:
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    csv_path = os.path.join(workdir, f"bench_{scale}x.csv")
+    ingest_path = os.path.join(workdir, f"ingest_{scale}x.db")
+    write_csv(csv_path, columns, rows, scale)
+
+    def ingest():
+        ingest_conn = sqlite3.connect(ingest_path)
+        try:
+            with ingest_conn:
+                ingest_csv(ingest_conn, csv_path, SOURCE_TABLE, mode="replace")
+        finally:
+            ingest_conn.close()
+
+    def sync(diff_only=False):
+        sync_conn = sqlite3.connect(ingest_path)
+        try:
+            with sync_conn:
+                if diff_only:
+                    # Bypasses the source-digest shortcut to time the row-by-row diff
+                    with open(csv_path, newline="", encoding="utf-8") as f:
+                        reader = csv.reader(f)
+                        sync_rows(sync_conn, SOURCE_TABLE, next(reader), reader)
+                else:
+                    sync_csv(sync_conn, csv_path, SOURCE_TABLE)
+        finally:
+            sync_conn.close()
+
+    try:
+        record("csv_ingest", measure(ingest, max(1, min(repeat, 3)), work=row_count), "rows/s")
+        # Re-syncing the file that was just loaded: nothing to write
+        record("csv_sync_diff", measure(lambda: sync(diff_only=True), max(1, min(repeat, 3)), work=row_count),
+               "rows/s")
+        record("csv_sync_unchanged", measure(sync, max(1, min(repeat, 3)), work=row_count), "rows/s")
+    finally:
+        for path in (csv_path, ingest_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """Print benchmarks whose p50 regressed by more than ``threshold``; return how many."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for result in results:
+        old = baseline.get((result["name"], result["scale"]))
+        if not old or not old["p50_ms"]:
+            continue
+        change = result["p50_ms"] / old["p50_ms"] - 1
+        if change > threshold:
+            regressions += 1
+            print(f"REGRESSION {result['name']} @ {result['scale']}x: "
+                  f"p50 {old['p50_ms']:.3f} ms -> {result['p50_ms']:.3f} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's data paths on synthetic datasets.")
+    parser.add_argument("--db", default=DB_PATH, help=f"database with the source {SOURCE_TABLE} rows")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help=f"multiples of the {SOURCE_TABLE} row count to test (e.g. 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="p50 slowdown (fraction) reported as a regression")
+    args = parser.parse_args(argv)
+
+    columns, rows = source_rows(args.db)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="xploria-bench-") as workdir:
+        for scale in args.scales:
+            results.extend(bench_scale(columns, rows, scale, args.repeat, workdir))
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "source_rows": len(rows),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
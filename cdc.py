@@ -0,0 +1,394 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import streamlit as st
+
+from db import DB_PATH, quote_ident
+from ingest import (CHUNK_SIZE, DEFAULT_CSV_TABLES, IngestError, converter, create_indexes, create_table,
+                    resolve_schema, table_columns)
+
+# --- Change Data Capture ---
+# Re-importing a source CSV by diffing it against the table instead of
+# replacing it. Each row is keyed by its natural key (the table's declared
+# primary key unless another is given) and compared by a hash of its values,
+# so only inserted, changed and removed rows are written. Triggers that the
+# app installs on the table (search, facets, analytics) stay in place and fire
+# for those rows alone. Every applied change is appended to app_cdc_log, which
+# other features read incrementally by sequence number.
+#
+# app_cdc_state remembers a digest of the file each table was last synced
+# from; touch triggers flag the table as dirty on any other write. Syncing the
+# same file into an untouched table is then answered from the digest alone.
+KEEP_SYNCS = 50
+DIGEST_BLOCK = 1 << 20
+
+CDC_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS app_cdc_syncs (
+        id INTEGER PRIMARY KEY,
+        tbl TEXT NOT NULL,
+        source TEXT,
+        synced_at REAL NOT NULL,
+        seconds REAL,
+        inserted INTEGER NOT NULL DEFAULT 0,
+        updated INTEGER NOT NULL DEFAULT 0,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        unchanged INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS app_cdc_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        sync_id INTEGER NOT NULL,
+        tbl TEXT NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+        row_key TEXT NOT NULL,
+        row_id INTEGER,
+        old_row TEXT,
+        new_row TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS app_cdc_log_sync ON app_cdc_log (sync_id)",
+    """CREATE TABLE IF NOT EXISTS app_cdc_state (
+        tbl TEXT PRIMARY KEY,
+        source_digest BLOB,
+        rows INTEGER NOT NULL,
+        dirty INTEGER NOT NULL DEFAULT 0
+    )""",
+)
+_OPS = {"ins": "INSERT", "del": "DELETE", "upd": "UPDATE"}
+
+SyncReport = namedtuple("SyncReport", ["table", "sync_id", "inserted", "updated", "deleted", "unchanged", "seconds"])
+Change = namedtuple("Change", ["seq", "sync_id", "table", "op", "key", "row_id", "old", "new"])
+
+
+def as_text(value):
+    """``value`` as it would most likely be spelled in a CSV cell.
+
+    Only used to skip converting source rows that are unchanged; a spelling
+    that differs ("4.50", "007") just takes the slower typed comparison. An
+    empty string maps to a cell that never occurs, since "" loads as NULL.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value if value else "\0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _typed(converters, values, line_no):
+    try:
+        return tuple(convert(value) for convert, value in zip(converters, values))
+    except ValueError as e:
+        raise IngestError(f"Line {line_no}: {e}") from e
+
+
+def _row_json(columns, row):
+    return json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str)
+
+
+def _rows_by_rowid(conn, table, columns, rowids):
+    column_list = ", ".join(quote_ident(c) for c in columns)
+    rows = {}
+    for start in range(0, len(rowids), CHUNK_SIZE):
+        chunk = rowids[start:start + CHUNK_SIZE]
+        for rowid, *values in conn.execute(
+            f"SELECT rowid, {column_list} FROM {quote_ident(table)} "
+            "WHERE rowid IN (SELECT value FROM json_each(?))", (json.dumps(chunk),)
+        ):
+            rows[rowid] = tuple(values)
+    return rows
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while block := f.read(DIGEST_BLOCK):
+            digest.update(block)
+    return digest.digest()
+
+
+def _trigger_names(table):
+    return [f"app_cdc_{table}_{op}" for op in _OPS]
+
+
+def install(conn, table=None):
+    """Create the CDC tables and, for ``table``, the triggers that mark it dirty."""
+    for statement in CDC_SCHEMA:
+        conn.execute(statement)
+    if table is None:
+        return
+    literal = "'" + table.replace("'", "''") + "'"
+    for name, (op, event) in zip(_trigger_names(table), _OPS.items()):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {quote_ident(name)} AFTER {event} ON {quote_ident(table)} BEGIN
+                UPDATE app_cdc_state SET dirty = 1 WHERE tbl = {literal};
+            END""")
+
+
+def _unchanged_rows(conn, table, digest):
+    """Row count of ``table`` if it was last synced from a file with ``digest`` and not written since."""
+    state = conn.execute("SELECT source_digest, rows, dirty FROM app_cdc_state WHERE tbl = ?", (table,)).fetchone()
+    if state is None or state[0] != digest or state[2]:
+        return None
+    names = _trigger_names(table)
+    placeholders = ", ".join("?" * len(names))
+    found = conn.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({placeholders})",
+                         names).fetchone()[0]
+    # A replaced table loses its triggers, and with them the dirty flag
+    return state[1] if found == len(names) else None
+
+
+def _record_sync(conn, table, source, seconds, inserted=0, updated=0, deleted=0, unchanged=0):
+    return conn.execute(
+        "INSERT INTO app_cdc_syncs (tbl, source, synced_at, seconds, inserted, updated, deleted, unchanged) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (table, source, time.time(), seconds, inserted, updated, deleted, unchanged)
+    ).lastrowid
+
+
+def sync_rows(conn, table, header, rows, key=None, source=None, first_line=2, source_digest=None):
+    """Apply the difference between the text ``rows`` (as read from a CSV) and ``table``, keyed on ``key``.
+
+    Runs inside the caller's transaction (one is started if none is open).
+    Rows whose key is missing from the source are deleted; rows sharing a key
+    in the table are collapsed to one. Changed rows are updated in place, and
+    only in the columns that differ. ``source_digest`` is remembered so the
+    next sync of an identical file can be skipped.
+    """
+    started = time.perf_counter()
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+
+    schema, columns = resolve_schema(conn, table, header)
+    names = [name for name, _ in columns]
+    key = tuple(key or schema.primary_key or ())
+    if not key:
+        raise IngestError(f"Sync into {table} needs a natural key")
+    missing = [k for k in key if k not in names]
+    if missing:
+        raise IngestError(f"Key column(s) not in the source: {', '.join(missing)}")
+
+    existing = [name for name, _ in table_columns(conn, table)]
+    if not existing:
+        create_table(conn, table, schema)
+    else:
+        extra = [name for name in names if name not in existing]
+        if extra:
+            raise IngestError(f"Columns not in {table}: {', '.join(extra)}; reload the table instead")
+
+    install(conn, table)
+    sync_id = _record_sync(conn, table, source, None)
+    key_index = [names.index(k) for k in key]
+    column_list = ", ".join(quote_ident(c) for c in names)
+
+    # key -> (rowid, hash of the row spelled as CSV text) for the table as it stands
+    current, deletes = {}, []
+    for rowid, *values in conn.execute(f"SELECT rowid, {column_list} FROM {quote_ident(table)}"):
+        row_key = tuple(values[i] for i in key_index)
+        if row_key in current:
+            deletes.append(rowid)
+        else:
+            current[row_key] = (rowid, hash(tuple(map(as_text, values))))
+
+    # Source rows whose text matches are unchanged without being converted
+    converters = [converter(sql_type) for _, sql_type in columns]
+    key_converters = [converters[i] for i in key_index]
+    inserts, candidates, seen, unchanged = [], [], set(), 0
+    for line_no, raw in enumerate(rows, start=first_line):
+        if not raw:
+            continue
+        if len(raw) != len(names):
+            raise IngestError(f"Line {line_no}: expected {len(names)} fields, got {len(raw)}")
+        row_key = _typed(key_converters, [raw[i] for i in key_index], line_no)
+        if row_key in seen:
+            raise IngestError(f"Line {line_no}: duplicate key {dict(zip(key, row_key))}")
+        seen.add(row_key)
+        entry = current.pop(row_key, None)
+        if entry is not None and entry[1] == hash(tuple(raw)):
+            unchanged += 1
+            continue
+        row = _typed(converters, raw, line_no)
+        if entry is None:
+            inserts.append(row)
+        else:
+            candidates.append((entry[0], row))
+    deletes.extend(rowid for rowid, _ in current.values())
+
+    log = []
+    if deletes:
+        old_rows = _rows_by_rowid(conn, table, names, deletes)
+        for rowid in deletes:
+            old = old_rows[rowid]
+            log.append((sync_id, table, "delete", json.dumps([old[i] for i in key_index], default=str), rowid,
+                        _row_json(names, old), None))
+        for start in range(0, len(deletes), CHUNK_SIZE):
+            conn.execute(f"DELETE FROM {quote_ident(table)} WHERE rowid IN (SELECT value FROM json_each(?))",
+                         (json.dumps(deletes[start:start + CHUNK_SIZE]),))
+
+    updates = []
+    if candidates:
+        old_rows = _rows_by_rowid(conn, table, names, [rowid for rowid, _ in candidates])
+        for rowid, row in candidates:
+            old = old_rows[rowid]
+            changed = [i for i, (a, b) in enumerate(zip(old, row)) if a != b or type(a) is not type(b)]
+            if not changed:
+                unchanged += 1
+                continue
+            updates.append(rowid)
+            assignments = ", ".join(f"{quote_ident(names[i])} = ?" for i in changed)
+            conn.execute(f"UPDATE {quote_ident(table)} SET {assignments} WHERE rowid = ?",
+                         [row[i] for i in changed] + [rowid])
+            log.append((sync_id, table, "update", json.dumps([row[i] for i in key_index], default=str), rowid,
+                        _row_json(names, old), _row_json(names, row)))
+
+    if inserts:
+        placeholders = ", ".join("?" * len(names))
+        sql = f"INSERT INTO {quote_ident(table)} ({column_list}) VALUES ({placeholders})"
+        for row in inserts:
+            rowid = conn.execute(sql, row).lastrowid
+            log.append((sync_id, table, "insert", json.dumps([row[i] for i in key_index], default=str), rowid,
+                        None, _row_json(names, row)))
+
+    conn.executemany(
+        "INSERT INTO app_cdc_log (sync_id, tbl, op, row_key, row_id, old_row, new_row) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        log)
+    create_indexes(conn, table, schema)
+    conn.execute("INSERT OR REPLACE INTO app_cdc_state (tbl, source_digest, rows, dirty) VALUES (?, ?, ?, 0)",
+                 (table, source_digest, len(seen)))
+    seconds = time.perf_counter() - started
+    conn.execute("UPDATE app_cdc_syncs SET seconds = ?, inserted = ?, updated = ?, deleted = ?, unchanged = ? "
+                 "WHERE id = ?", (seconds, len(inserts), len(updates), len(deletes), unchanged, sync_id))
+    prune_log(conn)
+    return SyncReport(table, sync_id, len(inserts), len(updates), len(deletes), unchanged, seconds)
+
+
+def sync_csv(conn, csv_path, table, key=None, delimiter=","):
+    """Sync ``csv_path`` into ``table``; an unchanged file into an untouched table is a no-op."""
+    started = time.perf_counter()
+    source = os.path.basename(csv_path)
+    digest = file_digest(csv_path)
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    install(conn)
+    rows = _unchanged_rows(conn, table, digest)
+    if rows is not None:
+        seconds = time.perf_counter() - started
+        return SyncReport(table, _record_sync(conn, table, source, seconds, unchanged=rows), 0, 0, 0, rows, seconds)
+
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise IngestError(f"{csv_path} is empty")
+        return sync_rows(conn, table, header, reader, key, source, source_digest=digest)
+
+
+def prune_log(conn, keep_syncs=KEEP_SYNCS):
+    """Keep the log entries of the last ``keep_syncs`` syncs."""
+    conn.execute("DELETE FROM app_cdc_log WHERE sync_id <= (SELECT MAX(id) FROM app_cdc_syncs) - ?", (keep_syncs,))
+
+
+def changes_since(conn, seq=0, table=None, limit=1000):
+    """Logged changes after sequence number ``seq``, oldest first.
+
+    Consumers keep the ``seq`` of the last change they applied and pass it
+    back on the next call. A consumer whose ``seq`` is older than the oldest
+    logged change has missed pruned entries and should rebuild from the table.
+    """
+    sql = "SELECT seq, sync_id, tbl, op, row_key, row_id, old_row, new_row FROM app_cdc_log WHERE seq > ?"
+    params = [seq]
+    if table is not None:
+        sql += " AND tbl = ?"
+        params.append(table)
+    sql += " ORDER BY seq LIMIT ?"
+    params.append(limit)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError:
+        return []  # nothing synced yet
+    return [Change(seq, sync_id, tbl, op, json.loads(row_key), row_id,
+                   json.loads(old) if old else None, json.loads(new) if new else None)
+            for seq, sync_id, tbl, op, row_key, row_id, old, new in rows]
+
+
+def recent_syncs(conn, limit=10):
+    try:
+        return conn.execute(
+            "SELECT id, tbl, source, synced_at, seconds, inserted, updated, deleted, unchanged "
+            "FROM app_cdc_syncs ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return []
+
+
+class SyncWatcher:
+    """Reports which tables were synced since the previous ``poll``.
+
+    Lets the app drop cached results for tables another process re-imported.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_seq = None
+
+    def poll(self, conn):
+        try:
+            last = conn.execute("SELECT MAX(seq) FROM app_cdc_log").fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            last = 0
+        with self._lock:
+            previous, self.last_seq = self.last_seq, last
+        if previous is None or last <= previous:
+            return set()
+        return {r[0] for r in conn.execute("SELECT DISTINCT tbl FROM app_cdc_log WHERE seq > ?", (previous,))}
+
+
+@st.cache_resource(show_spinner=False)
+def get_sync_watcher(path):
+    """The watcher for the database file at ``path``."""
+    return SyncWatcher()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync CSV files into the SQLite database, writing only the changes.")
+    parser.add_argument("csv_path", nargs="+", help="CSV file(s) to sync")
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite database path (default: {DB_PATH})")
+    parser.add_argument("--table", help="Target table (default: inferred from the file name)")
+    parser.add_argument("--key", help="comma-separated natural key columns (default: the table's primary key)")
+    parser.add_argument("--delimiter", default=",", help="field delimiter (use '\\t' for TSV)")
+    args = parser.parse_args(argv)
+
+    if args.table and len(args.csv_path) > 1:
+        parser.error("--table can only be used with a single CSV file")
+    delimiter = "\t" if args.delimiter == "\\t" else args.delimiter
+    key = [c.strip() for c in args.key.split(",")] if args.key else None
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        for csv_path in args.csv_path:
+            table = args.table or DEFAULT_CSV_TABLES.get(
+                os.path.basename(csv_path), os.path.splitext(os.path.basename(csv_path))[0]
+            )
+            try:
+                with conn:
+                    report = sync_csv(conn, csv_path, table, key, delimiter)
+            except (IngestError, sqlite3.Error, OSError) as e:
+                print(f"Failed to sync {csv_path}: {e}", file=sys.stderr)
+                return 1
+            print(f"Synced '{report.table}' in {report.seconds:.2f}s: {report.inserted:,} inserted, "
+                  f"{report.updated:,} updated, {report.deleted:,} deleted, {report.unchanged:,} unchanged")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import itertools
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+from metrics import TracingConnection
+
+# --- Database Settings ---
+DB_PATH = "data.db"
+READ_POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+CHECKOUT_TIMEOUT_S = 10
+# Serve reads from an in-memory snapshot of the database (XPLORIA_READ_REPLICA=1)
+READ_REPLICA = os.environ.get("XPLORIA_READ_REPLICA", "").lower() in ("1", "true", "yes")
+REPLICA_SYNC_S = 5
+
+_replica_ids = itertools.count(1)
+
+
+def quote_ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class ConnectionPool:
+    """Bounded pool of read-only connections plus one serialized writer.
+
+    The database runs in WAL mode so readers never block the writer (or each
+    other), and every connection waits up to ``busy_timeout_ms`` on a lock
+    instead of failing straight away with "database is locked".
+
+    With ``replica=True`` readers use a shared-cache in-memory copy of the
+    file made with the backup API, while the writer still writes to disk.
+    The copy is refreshed after each commit and, for changes made by other
+    processes, every ``sync_interval_s``. Each refresh goes into a fresh
+    in-memory database that is swapped in, so running reads are never
+    blocked; pooled readers move to the new copy at their next checkout.
+
+    ``attach`` sets other database files to ATTACH on every connection under
+    a schema alias, for cross-database queries. Connections opened before the
+    change are replaced at their next checkout.
+    """
+
+    def __init__(self, path, size=READ_POOL_SIZE, busy_timeout_ms=BUSY_TIMEOUT_MS, replica=False,
+                 sync_interval_s=REPLICA_SYNC_S):
+        self.path = path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.replica = replica
+        self._readers = queue.LifoQueue(maxsize=size)
+        self._all = []
+        self._all_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self.attached = ()
+        self.attach_errors = {}
+        self._attach_epoch = 0
+
+        # Slots start empty and are opened on first checkout
+        for _ in range(size):
+            self._readers.put(None)
+
+        conn = self._open()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+        if replica:
+            self._replica_id = next(_replica_ids)
+            self._replica_lock = threading.Lock()
+            self._generation = 0
+            self._snapshot = None  # keeps the current in-memory copy alive
+            self._watch = sqlite3.connect(path, check_same_thread=False)
+            self._synced_version = None
+            self.last_sync_at = None
+            self.last_sync_ms = None
+            self.syncs = 0
+            self.dirty_since = None
+            self.sync_replica(force=True)
+            self._stop = threading.Event()
+            self._sync_thread = threading.Thread(target=self._sync_loop, args=(sync_interval_s,),
+                                                 name="replica-sync", daemon=True)
+            self._sync_thread.start()
+
+    def _replica_uri(self, generation):
+        return f"file:xploria-replica-{os.getpid()}-{self._replica_id}-{generation}?mode=memory&cache=shared"
+
+    def _open(self, read_only=False):
+        if read_only and self.replica:
+            generation = self._generation
+            conn = sqlite3.connect(
+                self._replica_uri(generation),
+                uri=True,
+                check_same_thread=False,
+                factory=TracingConnection,
+            )
+            conn.generation = generation
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA query_only=ON")
+            return self._attach_all(conn)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            factory=TracingConnection,
+        )
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if read_only:
+            conn.execute("PRAGMA query_only=ON")
+        else:
+            # REPLACE conflicts must fire DELETE triggers so trigger-maintained stats stay exact
+            conn.execute("PRAGMA recursive_triggers=ON")
+        return self._attach_all(conn)
+
+    def _attach_all(self, conn):
+        conn.attach_epoch = self._attach_epoch
+        for alias, path in self.attached:
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {quote_ident(alias)}", (path,))
+            except sqlite3.Error as e:
+                self.attach_errors[alias] = str(e)  # the connection still works without it
+        return conn
+
+    def attach(self, attachments):
+        """ATTACH the ``(alias, path)`` pairs on every connection from now on."""
+        attachments = tuple(attachments)
+        if attachments == self.attached:
+            return False
+        self.attached = attachments
+        self.attach_errors = {}
+        self._attach_epoch += 1
+        return True
+
+    def _stale(self, conn):
+        if conn.attach_epoch != self._attach_epoch:
+            return True
+        return self.replica and conn.generation != self._generation
+
+    def open_reader(self):
+        """Open a dedicated read-only connection outside the pool; the caller closes it."""
+        return self._open(read_only=True)
+
+    def _track(self, conn):
+        with self._all_lock:
+            self._all.append(conn)
+        return conn
+
+    def _untrack(self, conn):
+        with self._all_lock:
+            self._all.remove(conn)
+        conn.close()
+
+    # --- Read replica ---
+    def sync_replica(self, force=False):
+        """Copy the file into a new in-memory snapshot if it changed since the last copy.
+
+        Returns True when a new snapshot was swapped in.
+        """
+        if not self.replica:
+            return False
+        with self._replica_lock:
+            version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+            if not force and version == self._synced_version:
+                return False
+            started = time.perf_counter()
+            generation = self._generation + 1
+            snapshot = sqlite3.connect(self._replica_uri(generation), uri=True, check_same_thread=False)
+            self._watch.backup(snapshot)
+            # Old snapshots live on until their last pooled reader is recycled
+            previous, self._snapshot = self._snapshot, snapshot
+            self._generation = generation
+            if previous is not None:
+                previous.close()
+            self._synced_version = version
+            self.last_sync_at = time.time()
+            self.last_sync_ms = (time.perf_counter() - started) * 1000
+            self.syncs += 1
+            self.dirty_since = None
+            return True
+
+    def _sync_loop(self, interval_s):
+        while not self._stop.wait(interval_s):
+            try:
+                with self._replica_lock:
+                    changed = self._watch.execute("PRAGMA data_version").fetchone()[0] != self._synced_version
+                    if changed and self.dirty_since is None:
+                        self.dirty_since = time.time()
+                if changed:
+                    self.sync_replica()
+            except sqlite3.Error:
+                pass  # retried on the next tick
+
+    def replica_stats(self):
+        """Staleness and memory figures for the Performance Monitor."""
+        if not self.replica:
+            return None
+        with self._replica_lock:
+            page_count = self._snapshot.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._snapshot.execute("PRAGMA page_size").fetchone()[0]
+            pending = self._watch.execute("PRAGMA data_version").fetchone()[0] != self._synced_version
+            if pending and self.dirty_since is None:
+                self.dirty_since = time.time()
+            now = time.time()
+            return {
+                "generation": self._generation,
+                "syncs": self.syncs,
+                "last_sync_ms": self.last_sync_ms,
+                "age_s": now - self.last_sync_at,
+                "stale_s": now - self.dirty_since if pending else 0.0,
+                "pending_changes": pending,
+                "memory_bytes": page_count * page_size,
+            }
+
+    @contextmanager
+    def reader(self, timeout=CHECKOUT_TIMEOUT_S):
+        """Borrow a read-only connection, waiting if every slot is in use."""
+        try:
+            conn = self._readers.get(timeout=timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a free database connection")
+        try:
+            if conn is not None and self._stale(conn):
+                self._untrack(conn)
+                conn = None
+            if conn is None:
+                conn = self._track(self._open(read_only=True))
+            yield conn
+        finally:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def external_version(self):
+        """A stamp that changes when another process commits to the database or an attached file.
+
+        PRAGMA data_version on a connection only changes for commits made
+        through other connections, and every write in this process goes
+        through the writer, so the app's own writes leave it unchanged.
+        Returns None while the writer is busy.
+        """
+        if not self._writer_lock.acquire(blocking=False):
+            return None
+        try:
+            if self._writer is not None and self._writer.attach_epoch != self._attach_epoch:
+                self._untrack(self._writer)
+                self._writer = None
+            if self._writer is None:
+                self._writer = self._track(self._open())
+            # Not traced: this runs on every result-cache lookup
+            return (self._writer.attach_epoch, *(
+                sqlite3.Connection.execute(self._writer, f"PRAGMA {quote_ident(schema)}.data_version").fetchone()[0]
+                for schema in ("main", *(alias for alias, _ in self.attached))
+            ))
+        finally:
+            self._writer_lock.release()
+
+    @contextmanager
+    def writer(self):
+        """Borrow the single writer; commits on success, rolls back on error."""
+        with self._writer_lock:
+            if self._writer is not None and self._writer.attach_epoch != self._attach_epoch:
+                self._untrack(self._writer)
+                self._writer = None
+            if self._writer is None:
+                self._writer = self._track(self._open())
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+        # Read-your-writes: pages read after a write see it
+        self.sync_replica()
+
+    def close(self):
+        if self.replica:
+            self._stop.set()
+            with self._replica_lock:
+                self._watch.close()
+                self._snapshot.close()
+        with self._all_lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool(path=DB_PATH, replica=READ_REPLICA):
+    return ConnectionPool(path, replica=replica)
@@ -0,0 +1,244 @@
+import base64
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from metrics import current_page, set_page
+from query_runner import guarded
+
+# --- Result Export ---
+# Query results are streamed from the cursor with fetchmany and appended to a
+# temp file one batch at a time (a Parquet row group per batch), so memory
+# stays bounded by the batch size however large the result is. Exports run
+# under the query guardrails' progress handler with a far larger budget, and
+# ExportJob runs them off the script thread so they can be cancelled.
+EXPORT_BATCH = 5000
+EXPORT_TIMEOUT_S = 600
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "xploria-exports")
+EXPORT_MAX_AGE_S = 3600
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSON Lines": ("jsonl", "application/x-ndjson"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+ExportReport = namedtuple("ExportReport", ["path", "format", "rows", "bytes", "seconds"])
+
+
+class ExportError(Exception):
+    pass
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class _CsvWriter:
+    def __init__(self, f, columns):
+        self.writer = csv.writer(f)
+        self.writer.writerow(columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class _JsonLinesWriter:
+    def __init__(self, f, columns):
+        self.f = f
+        self.columns = columns
+
+    def write(self, rows):
+        self.f.writelines(
+            json.dumps(dict(zip(self.columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        pass
+
+
+def _arrow_type(values):
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return pa.string()
+    if kinds <= {int}:
+        return pa.int64()
+    if kinds <= {int, float}:
+        return pa.float64()
+    if kinds == {bytes}:
+        return pa.binary()
+    return pa.string()
+
+
+class _ParquetWriter:
+    """Writes one row group per batch.
+
+    Column types are inferred from the first batch; SQLite columns holding
+    mixed types are written as strings.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    def write(self, rows):
+        values = list(zip(*rows)) if rows else [[] for _ in self.columns]
+        if self.writer is None:
+            schema = pa.schema([(name, _arrow_type(col)) for name, col in zip(self.columns, values)])
+            self.writer = pq.ParquetWriter(self.path, schema)
+        arrays = []
+        for field, col in zip(self.writer.schema, values):
+            if pa.types.is_string(field.type):
+                col = [v if v is None or isinstance(v, str) else str(v) for v in col]
+            try:
+                arrays.append(pa.array(col, type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError) as e:
+                raise ExportError(f"Column {field.name} changes type part-way through the result ({e}); "
+                                  "CAST it in the query or export as CSV") from e
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def cleanup_exports(max_age_s=EXPORT_MAX_AGE_S):
+    """Remove export files older than ``max_age_s``."""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age_s
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass  # removed by another session
+
+
+def export_query(conn, sql, fmt, batch_size=EXPORT_BATCH, on_batch=None, timeout_s=EXPORT_TIMEOUT_S,
+                 cancel_event=None):
+    """Stream the full result of ``sql`` into a temp file in format ``fmt``.
+
+    ``on_batch(rows_written)`` is called after each batch. Running past
+    ``timeout_s`` or setting ``cancel_event`` raises ExportError and removes
+    the partial file. The caller owns the returned file and should delete it
+    when done.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format {fmt!r}")
+    extension = EXPORT_FORMATS[fmt][0]
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="export-", suffix=f".{extension}", dir=EXPORT_DIR)
+
+    # pyarrow opens the path itself; the text formats write through the descriptor
+    if fmt == "Parquet":
+        os.close(fd)
+        f = None
+    else:
+        f = os.fdopen(fd, "w", newline="", encoding="utf-8")
+
+    started = time.perf_counter()
+    rows_written = 0
+    completed = False
+    cursor = conn.cursor()
+    try:
+        with guarded(conn, timeout_s, cancel_event) as stopped:
+            try:
+                cursor.execute(sql)
+                if not cursor.description:
+                    raise ExportError("The statement returned no result set to export")
+                columns = [d[0] for d in cursor.description]
+                if f is None:
+                    writer = _ParquetWriter(path, columns)
+                else:
+                    writer = (_CsvWriter if fmt == "CSV" else _JsonLinesWriter)(f, columns)
+                try:
+                    while True:
+                        batch = cursor.fetchmany(batch_size)
+                        if not batch and rows_written:
+                            break
+                        writer.write(batch)
+                        rows_written += len(batch)
+                        if on_batch:
+                            on_batch(rows_written)
+                        if not batch:
+                            break  # empty result: the header/schema has been written
+                        if cancel_event is not None and cancel_event.is_set():
+                            stopped.append("cancelled")
+                            break
+                finally:
+                    writer.close()
+            except sqlite3.OperationalError:
+                if not stopped:
+                    raise
+        if stopped:
+            raise ExportError(f"Export cancelled after {rows_written:,} rows" if stopped[0] == "cancelled"
+                              else f"Export stopped by its {timeout_s}s time budget after {rows_written:,} rows")
+        completed = True
+    finally:
+        cursor.close()
+        if f is not None:
+            f.close()
+        if not completed:
+            os.remove(path)
+    return ExportReport(path, fmt, rows_written, os.path.getsize(path), time.perf_counter() - started)
+
+
+class ExportJob:
+    """One export running on the shared query worker pool, cancellable from the page."""
+
+    def __init__(self, sql, fmt):
+        self.page = current_page()
+        self.sql = sql
+        self.format = fmt
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.rows_written = 0
+        self.report = None
+        self.error = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def discard(self):
+        """Cancel the export, or delete its file if it already finished."""
+        self.cancel()
+        if self.report is not None and os.path.exists(self.report.path):
+            os.remove(self.report.path)
+
+    def _on_batch(self, rows_written):
+        self.rows_written = rows_written
+
+    def run(self, pool):
+        set_page(self.page)
+        conn = None
+        try:
+            conn = pool.open_reader()
+            self.report = export_query(conn, self.sql, self.format, on_batch=self._on_batch,
+                                       cancel_event=self.cancel_event)
+        except (ExportError, sqlite3.Error, OSError) as e:
+            self.error = e
+        finally:
+            if conn is not None:
+                conn.close()
+            self.done.set()
+
+    def submit(self, executor, pool):
+        executor.submit(self.run, pool)
+        return self
@@ -0,0 +1,277 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import streamlit as st
+
+from db import quote_ident
+
+# --- Facet Index ---
+# Category, tier, hashtag and rating-bucket facets over CategoryAI, held in
+# memory as one bitmap (a Python int) per facet value. Rowids are mapped to
+# dense slot numbers (bit n = slot n), so bitmaps stay as long as the row
+# count however sparse the rowids are. Counts for any combination of filters
+# are popcounts of ANDed bitmaps, so no query runs per click. Triggers append changed rowids to app_facet_changes; each
+# sync re-reads only those rows. A change with a NULL rowid (written when the
+# triggers are installed) forces a full rebuild, which is how a replaced
+# table is picked up.
+SOURCE_TABLE = "CategoryAI"
+FACETS = ("category", "tier", "hashtag", "rating")
+# (lower bound, label), highest first; rows without a rating_score are "Unrated"
+RATING_BUCKETS = [(4.5, "4.5 – 5.0"), (4.0, "4.0 – 4.4"), (3.0, "3.0 – 3.9"), (0.0, "Below 3.0")]
+UNRATED = "Unrated"
+CHANGE_LOG_KEEP = 50_000
+RESULT_LIMIT = 200
+# Slots of deleted rows are compacted away on the next sync past this many
+SLOT_SLACK = 4096
+
+_TRIGGERS = ("app_facet_ins", "app_facet_del", "app_facet_upd")
+# Tags may contain spaces ("#Sales & Marketing"), so split only before a "#"
+_TAG_BOUNDARY = re.compile(r"\s+(?=#)")
+
+CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_facet_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    row_id INTEGER
+)
+"""
+
+
+def rating_bucket(score):
+    if score is None:
+        return UNRATED
+    for bound, label in RATING_BUCKETS:
+        if score >= bound:
+            return label
+    return RATING_BUCKETS[-1][1]
+
+
+def row_facets(category, tier, hashtags, rating_score):
+    """The (facet, value) pairs one CategoryAI row belongs to."""
+    pairs = [("rating", rating_bucket(rating_score))]
+    if category is not None:
+        pairs.append(("category", category))
+    if tier is not None:
+        pairs.append(("tier", tier))
+    hashtags = (hashtags or "").strip()
+    if hashtags:
+        pairs.extend(("hashtag", tag) for tag in set(_TAG_BOUNDARY.split(hashtags)))
+    return pairs
+
+
+def facets_ready(conn):
+    placeholders = ", ".join("?" * len(_TRIGGERS))
+    found = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({placeholders})", _TRIGGERS
+    ).fetchone()[0]
+    return found == len(_TRIGGERS)
+
+
+def install_facet_triggers(conn):
+    """Create the change log and triggers and queue a full rebuild. Needs a writable connection."""
+    source = quote_ident(SOURCE_TABLE)
+    conn.execute(CHANGES_SCHEMA)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_facet_ins AFTER INSERT ON {source} BEGIN
+            INSERT INTO app_facet_changes (row_id) VALUES (NEW.rowid);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_facet_del AFTER DELETE ON {source} BEGIN
+            INSERT INTO app_facet_changes (row_id) VALUES (OLD.rowid);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_facet_upd
+        AFTER UPDATE OF category, tier, hashtags, rating_score ON {source} BEGIN
+            INSERT INTO app_facet_changes (row_id) VALUES (OLD.rowid);
+            INSERT INTO app_facet_changes (row_id) SELECT NEW.rowid WHERE NEW.rowid IS NOT OLD.rowid;
+        END""")
+    conn.execute("INSERT INTO app_facet_changes (row_id) VALUES (NULL)")
+
+
+def prune_changes(conn, keep=CHANGE_LOG_KEEP):
+    """Trim the change log; an index that falls behind the trimmed range rebuilds."""
+    conn.execute("DELETE FROM app_facet_changes WHERE seq <= (SELECT MAX(seq) FROM app_facet_changes) - ?", (keep,))
+
+
+class FacetIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+        self._row_pairs = {}
+        self._reset_slots()
+        self.all_rows = 0
+        self.last_seq = None
+        self.log_size = 0
+        self.rebuilds = 0
+        self.rows_applied = 0
+        self.sync_ms = 0.0
+
+    def _reset_slots(self):
+        self._slots = {}
+        self._slot_rowids = np.empty(1024, dtype=np.int64)
+
+    def _slot(self, rowid):
+        slot = self._slots.get(rowid)
+        if slot is None:
+            slot = self._slots[rowid] = len(self._slots)
+            if slot == len(self._slot_rowids):
+                # A new array, so rowids() calls decoding with the old one stay valid
+                self._slot_rowids = np.concatenate([self._slot_rowids, np.empty_like(self._slot_rowids)])
+            self._slot_rowids[slot] = rowid
+        return slot
+
+    def _set(self, rowid, pairs):
+        bit = 1 << self._slot(rowid)
+        for facet, value in pairs:
+            self.bitmaps[facet][value] |= bit
+        self._row_pairs[rowid] = pairs
+        self.all_rows |= bit
+
+    def _clear(self, rowid):
+        if rowid not in self._slots:
+            return
+        bit = 1 << self._slots[rowid]
+        for facet, value in self._row_pairs.pop(rowid, ()):
+            bitmap = self.bitmaps[facet][value] & ~bit
+            if bitmap:
+                self.bitmaps[facet][value] = bitmap
+            else:
+                del self.bitmaps[facet][value]
+        self.all_rows &= ~bit
+
+    def _rows(self, conn, rowids=None):
+        sql = f"SELECT rowid, category, tier, hashtags, rating_score FROM {quote_ident(SOURCE_TABLE)}"
+        if rowids is None:
+            return conn.execute(sql)
+        return conn.execute(sql + " WHERE rowid IN (SELECT value FROM json_each(?))", (json.dumps(rowids),))
+
+    def sync(self, conn):
+        """Bring the bitmaps up to date with the change log; returns rows re-read."""
+        started = time.perf_counter()
+        with self._lock:
+            # One read transaction so the rows and the log position agree
+            conn.execute("BEGIN")
+            try:
+                first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM app_facet_changes").fetchone()
+                changes = []
+                if self.last_seq is not None and first is not None and first <= self.last_seq + 1:
+                    changes = [r[0] for r in conn.execute(
+                        "SELECT row_id FROM app_facet_changes WHERE seq > ?", (self.last_seq,))]
+                stale_slots = len(self._slots) - len(self._row_pairs) > SLOT_SLACK
+                if (self.last_seq is None or None in changes or stale_slots
+                        or (first is not None and first > self.last_seq + 1)):
+                    self.bitmaps = {facet: defaultdict(int) for facet in FACETS}
+                    self._row_pairs, self.all_rows = {}, 0
+                    if stale_slots:
+                        self._reset_slots()
+                    applied = 0
+                    for rowid, *values in self._rows(conn):
+                        self._set(rowid, row_facets(*values))
+                        applied += 1
+                    self.rebuilds += 1
+                elif changes:
+                    changed = sorted(set(changes))
+                    for rowid in changed:
+                        self._clear(rowid)
+                    for rowid, *values in self._rows(conn, changed):
+                        self._set(rowid, row_facets(*values))
+                    applied = len(changed)
+                else:
+                    applied = 0
+                self.last_seq = last if last is not None else 0
+                self.log_size = last - first + 1 if last is not None else 0
+            finally:
+                conn.rollback()
+            self.rows_applied += applied
+            self.sync_ms = (time.perf_counter() - started) * 1000
+            return applied
+
+    def _facet_mask(self, facet, selected):
+        bitmaps = self.bitmaps[facet]
+        mask = 0
+        for value in selected:
+            mask |= bitmaps.get(value, 0)
+        return mask
+
+    def query(self, selections):
+        """Counts per facet value and the matching rowid bitmap for ``selections``.
+
+        Values of one facet are ORed and facets are ANDed. Each facet's counts
+        ignore that facet's own selection, so picking a second category still
+        shows how many tools it would add.
+        """
+        with self._lock:
+            masks = {f: self._facet_mask(f, v) for f, v in selections.items() if v}
+            counts = {}
+            for facet in FACETS:
+                base = self.all_rows
+                for other, mask in masks.items():
+                    if other != facet:
+                        base &= mask
+                counts[facet] = {value: (bitmap & base).bit_count()
+                                 for value, bitmap in self.bitmaps[facet].items()}
+            matched = self.all_rows
+            for mask in masks.values():
+                matched &= mask
+            return counts, matched
+
+    def rowids(self, bitmap):
+        """The rowids of the slots set in ``bitmap``, decoded in linear time."""
+        with self._lock:
+            slot_rowids = self._slot_rowids
+        return slot_rowids[bitmap_slots(bitmap)]
+
+
+def bitmap_slots(bitmap):
+    """The bit positions set in ``bitmap``, ascending."""
+    if not bitmap:
+        return np.empty(0, dtype=np.int64)
+    packed = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(packed, bitorder="little"))
+
+
+def fetch_tools(conn, rowids=None, limit=RESULT_LIMIT, offset=0):
+    """One page of the matched tools as (rowid, title, ...) rows, most upvoted first.
+
+    SQLite orders the matched rowids and applies LIMIT/OFFSET, so only the
+    page's rows are read out. ``rowids=None`` (no filter selected) skips
+    passing the rowids at all.
+    """
+    sql = (f"SELECT rowid, title, category, tier, rating_score, upvotes, hashtags, tool_url "
+           f"FROM {quote_ident(SOURCE_TABLE)}")
+    if rowids is None:
+        return conn.execute(sql + " ORDER BY upvotes DESC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+    if not len(rowids):
+        return []
+    return conn.execute(
+        sql + " WHERE rowid IN (SELECT value FROM json_each(?)) ORDER BY upvotes DESC LIMIT ? OFFSET ?",
+        (json.dumps(rowids.tolist()), limit, offset),
+    ).fetchall()
+
+
+def ensure_facets(pool, index):
+    """Install the change triggers if needed, then sync ``index``."""
+    with pool.reader() as conn:
+        ready = facets_ready(conn)
+    if not ready:
+        with pool.writer() as conn:
+            if not facets_ready(conn):
+                install_facet_triggers(conn)
+    with pool.reader() as conn:
+        index.sync(conn)
+    if index.log_size > 2 * CHANGE_LOG_KEEP:
+        try:
+            with pool.writer() as conn:
+                prune_changes(conn)
+        except sqlite3.Error:
+            pass  # pruning is housekeeping; the next sync retries
+
+
+@st.cache_resource(show_spinner=False)
+def get_facet_index(path):
+    """The facet index over the database file at ``path``."""
+    return FacetIndex()
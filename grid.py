@@ -0,0 +1,63 @@
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+# --- Result Grid ---
+# Results go to the browser as Arrow through st.dataframe, whose canvas grid
+# only draws the visible rows and clips long text to the column width (the
+# full value opens on click). This replaces DataFrame.to_html, which shipped
+# every cell as markup plus a CSS block on each rerun.
+GRID_HEIGHT = 500
+WIDE_TEXT_CHARS = 60
+
+
+def _column_config(df):
+    config = {}
+    for name in df.columns:
+        series = df[name]
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series)):
+            continue
+        sample = series.dropna().head(200).astype(str)
+        if sample.empty:
+            continue
+        if sample.str.match(r"https?://").all():
+            config[name] = st.column_config.LinkColumn(name, width="medium")
+        elif sample.str.len().mean() > WIDE_TEXT_CHARS:
+            config[name] = st.column_config.TextColumn(name, width="large")
+    return config
+
+
+def arrow_payload_bytes(df):
+    """Size of ``df`` serialized as an Arrow IPC stream, i.e. what the grid sends."""
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        # SQLite columns can mix types; Streamlit falls back to strings the same way
+        table = pa.Table.from_pandas(df.astype(str), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def render_grid(df, caption=None, height=GRID_HEIGHT):
+    """Render ``df`` in the virtualized grid and report the payload size.
+
+    Returns the Arrow payload size in bytes; the running total per session is
+    kept in ``st.session_state["grid_bytes_sent"]``.
+    """
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    nbytes = arrow_payload_bytes(df)
+    st.session_state["grid_bytes_sent"] = st.session_state.get("grid_bytes_sent", 0) + nbytes
+
+    st.dataframe(
+        df,
+        hide_index=True,
+        width="stretch",
+        height=min(height, 38 + 35 * max(len(df), 1)),
+        column_config=_column_config(df),
+    )
+    size = f"{nbytes / 1024:,.1f} KiB sent"
+    st.caption(f"{caption} · {size}" if caption else f"{len(df):,} rows · {size}")
+    return nbytes
@@ -0,0 +1,370 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+
+from db import DB_PATH, quote_ident
+
+# --- Declared Schemas ---
+# Column types, primary key and secondary indexes for the tables loaded from
+# the shipped CSV sheets. Tables not listed here take their types from the
+# existing table, or TEXT for every column when the table is new.
+TableSchema = namedtuple("TableSchema", ["columns", "primary_key", "indexes"])
+
+TABLE_SCHEMAS = {
+    "CategoryAI": TableSchema(
+        columns=[
+            ("category", "TEXT"),
+            ("rank", "INTEGER"),
+            ("rating_score", "REAL"),
+            ("rating_stars", "INTEGER"),
+            ("rating_value", "TEXT"),
+            ("tier", "TEXT"),
+            ("icon_url", "TEXT"),
+            ("title", "TEXT"),
+            ("tool_url", "TEXT"),
+            ("verified_icon", "TEXT"),
+            ("description", "TEXT"),
+            ("hashtags", "TEXT"),
+            ("upvote_icon", "TEXT"),
+            ("upvotes", "INTEGER"),
+            ("visit_icon", "TEXT"),
+            ("visit_text", "TEXT"),
+        ],
+        primary_key=("category", "rank"),
+        indexes=[("tier",), ("rating_stars",), ("tool_url",)],
+    ),
+    "Top_100_AI": TableSchema(
+        columns=[("Category", "TEXT"), ("AI_Tool", "TEXT"), ("URL", "TEXT")],
+        primary_key=("Category", "AI_Tool"),
+        indexes=[("URL",)],
+    ),
+}
+
+DEFAULT_CSV_TABLES = {
+    "Top_100_2.csv": "Top_100_AI",
+    "Category AI Tools Sheet.csv": "CategoryAI",
+}
+
+MODES = ("replace", "append", "upsert")
+CHUNK_SIZE = 5000
+UPLOAD_FORMATS = {"CSV": ",", "TSV": "\t", "JSON lines": None}
+MAX_REPORTED_ERRORS = 20
+
+IngestReport = namedtuple("IngestReport", ["table", "rows", "seconds"])
+
+
+class IngestError(Exception):
+    pass
+
+
+def rows_per_sec(report):
+    return report.rows / report.seconds if report.seconds else float("inf")
+
+
+def converter(sql_type):
+    sql_type = (sql_type or "").upper()
+    if "INT" in sql_type:
+        cast = int
+    elif any(t in sql_type for t in ("REAL", "FLOA", "DOUB")):
+        cast = float
+    else:
+        cast = str
+
+    def convert(value):
+        # Empty cells load as NULL, matching what pandas used to write
+        if value is None or value == "":
+            return None
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"nested value {json.dumps(value)[:40]} is not a {sql_type or 'scalar'}")
+        if cast is int and isinstance(value, str) and "." in value:
+            # "5.0" is a valid INTEGER; "4.7" would lose its fraction, so it is rejected
+            value = float(value)
+        if cast is int and isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f"{value} is not an integer")
+            return int(value)
+        return cast(value)
+
+    return convert
+
+
+def table_columns(conn, table):
+    return [(c[1], c[2]) for c in conn.execute(f"PRAGMA table_info({quote_ident(table)})")]
+
+
+def resolve_schema(conn, table, header):
+    schema = TABLE_SCHEMAS.get(table)
+    if schema is None:
+        existing = dict(table_columns(conn, table))
+        schema = TableSchema([(name, existing.get(name, "TEXT")) for name in header], None, [])
+
+    declared = [name for name, _ in schema.columns]
+    missing = [name for name in header if name not in declared]
+    if missing:
+        raise IngestError(f"Columns not in the {table} schema: {', '.join(missing)}")
+    types = dict(schema.columns)
+    return schema, [(name, types[name]) for name in header]
+
+
+def create_table(conn, table, schema):
+    column_defs = [f"{quote_ident(name)} {sql_type}" for name, sql_type in schema.columns]
+    if schema.primary_key:
+        column_defs.append(f"PRIMARY KEY ({', '.join(quote_ident(c) for c in schema.primary_key)})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {quote_ident(table)} ({', '.join(column_defs)})")
+
+
+def create_indexes(conn, table, schema):
+    for columns in schema.indexes:
+        index_name = quote_ident(f"idx_{table}_{'_'.join(columns)}")
+        column_list = ", ".join(quote_ident(c) for c in columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {quote_ident(table)} ({column_list})")
+
+
+def has_unique_key(conn, table, columns):
+    """Whether ``table``'s PRIMARY KEY or a full UNIQUE index covers exactly ``columns``."""
+    wanted = {c.lower() for c in columns}
+    if {c[1].lower() for c in conn.execute(f"PRAGMA table_info({quote_ident(table)})") if c[5]} == wanted:
+        return True
+    for _, name, unique, _, partial in conn.execute(f"PRAGMA index_list({quote_ident(table)})"):
+        if unique and not partial:
+            indexed = {c[2].lower() for c in conn.execute(f"PRAGMA index_info({quote_ident(name)})") if c[2]}
+            if indexed == wanted:
+                return True
+    return False
+
+
+def ensure_upsert_key(conn, table, columns, create=False):
+    """Make sure ON CONFLICT (``columns``) has a matching key, adding a UNIQUE index if ``create``."""
+    if has_unique_key(conn, table, columns):
+        return
+    key = ", ".join(columns)
+    if not create:
+        raise IngestError(f"Upsert into {table} needs a PRIMARY KEY or UNIQUE index on ({key}); "
+                          "rerun with --create-key to add one")
+    index_name = quote_ident(f"idx_{table}_{'_'.join(columns)}_key")
+    column_list = ", ".join(quote_ident(c) for c in columns)
+    try:
+        conn.execute(f"CREATE UNIQUE INDEX {index_name} ON {quote_ident(table)} ({column_list})")
+    except sqlite3.IntegrityError as e:
+        raise IngestError(f"Cannot add a unique key on ({key}) to {table}: it has duplicate rows") from e
+
+
+def insert_sql(table, columns, mode, primary_key=None):
+    column_list = ", ".join(quote_ident(c) for c in columns)
+    placeholders = ", ".join("?" * len(columns))
+    sql = f"INSERT INTO {quote_ident(table)} ({column_list}) VALUES ({placeholders})"
+    if mode == "upsert":
+        if not primary_key:
+            raise IngestError(f"Upsert into {table} needs a declared primary key")
+        updates = [c for c in columns if c not in primary_key]
+        conflict = ", ".join(quote_ident(c) for c in primary_key)
+        if updates:
+            assignments = ", ".join(f"{quote_ident(c)} = excluded.{quote_ident(c)}" for c in updates)
+            sql += f" ON CONFLICT ({conflict}) DO UPDATE SET {assignments}"
+        else:
+            sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+    return sql
+
+
+def typed_rows(reader, columns, first_line=2, errors=None):
+    """Convert raw rows to the declared column types.
+
+    Raises IngestError on the first bad row, or, when an ``errors`` list is
+    given, records the problem there, skips the row and carries on so every
+    bad line can be reported at once.
+    """
+    converters = [converter(sql_type) for _, sql_type in columns]
+    for line_no, row in enumerate(reader, start=first_line):
+        if not row:
+            continue
+        try:
+            if len(row) != len(converters):
+                raise ValueError(f"expected {len(converters)} fields, got {len(row)}")
+            yield tuple(convert(value) for convert, value in zip(converters, row))
+        except ValueError as e:
+            if errors is None:
+                raise IngestError(f"Line {line_no}: {e}") from e
+            errors.append(f"Line {line_no}: {e}")
+
+
+def load_rows(conn, table, header, rows, mode="append", chunk_size=CHUNK_SIZE, on_chunk=None, create_key=False):
+    """Load an iterable of row tuples into ``table`` in bounded chunks.
+
+    Runs inside the caller's transaction (one is started if none is open) so
+    the whole load commits or rolls back as a unit. Secondary indexes are
+    built after the rows are in. ``on_chunk(rows_so_far, elapsed)`` is called
+    after every ``executemany`` batch. An upsert into a table without a key
+    on the primary-key columns fails unless ``create_key`` adds one.
+    """
+    if mode not in MODES:
+        raise IngestError(f"Unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+
+    started = time.perf_counter()
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+
+    schema, columns = resolve_schema(conn, table, header)
+    if mode == "replace":
+        conn.execute(f"DROP TABLE IF EXISTS {quote_ident(table)}")
+    create_table(conn, table, schema)
+
+    primary_key = schema.primary_key
+    if mode == "upsert" and not primary_key:
+        primary_key = [c[1] for c in sorted(
+            (c for c in conn.execute(f"PRAGMA table_info({quote_ident(table)})") if c[5]),
+            key=lambda c: c[5],
+        )]
+    sql = insert_sql(table, [name for name, _ in columns], mode, primary_key)
+    if mode == "upsert":
+        ensure_upsert_key(conn, table, primary_key, create_key)
+
+    total = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+        if on_chunk:
+            on_chunk(total, time.perf_counter() - started)
+
+    create_indexes(conn, table, schema)
+    return IngestReport(table, total, time.perf_counter() - started)
+
+
+def ingest_csv(conn, csv_path, table, mode="replace", chunk_size=CHUNK_SIZE, delimiter=",", on_chunk=None,
+               create_key=False):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            header = next(reader)
+        except StopIteration:
+            raise IngestError(f"{csv_path} is empty")
+        schema, columns = resolve_schema(conn, table, header)
+        return load_rows(conn, table, header, typed_rows(reader, columns), mode, chunk_size, on_chunk, create_key)
+
+
+def _json_lines(lines):
+    header, first_line = None, 1
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise IngestError(f"Line {line_no}: invalid JSON ({e.msg})") from e
+        if not isinstance(record, dict):
+            raise IngestError(f"Line {line_no}: expected a JSON object")
+        if header is None:
+            header, first_line = list(record), line_no
+            yield header, first_line
+        unknown = [key for key in record if key not in header]
+        if unknown:
+            raise IngestError(f"Line {line_no}: keys not in the first object: {', '.join(unknown)}")
+        yield [record.get(name) for name in header]
+
+
+def parse_upload(text_stream, fmt):
+    """Split an uploaded CSV/TSV/JSON-lines stream into ``(header, rows, first_line)``.
+
+    ``rows`` is a lazy iterator of raw field lists; for JSON lines the header is
+    the key order of the first object and later objects may omit keys.
+    """
+    if fmt not in UPLOAD_FORMATS:
+        raise IngestError(f"Unknown format {fmt!r}")
+    if UPLOAD_FORMATS[fmt] is None:
+        records = _json_lines(text_stream)
+        try:
+            header, first_line = next(records)
+        except StopIteration:
+            raise IngestError("No JSON objects found")
+        return header, records, first_line
+
+    reader = csv.reader(text_stream, delimiter=UPLOAD_FORMATS[fmt])
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise IngestError("No header row found")
+    return [h.strip() for h in header], reader, 2
+
+
+def load_upload(conn, table, data, fmt, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """Validate and append uploaded rows (bytes or text) to an existing table.
+
+    Rows are checked against the table's declared column types as they
+    stream in. If any row fails, every problem found is reported in the
+    IngestError and the caller's transaction should be rolled back, so a
+    load is all-or-nothing.
+    """
+    if isinstance(data, bytes):
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+    else:
+        stream = io.StringIO(data, newline="")
+
+    existing = dict(table_columns(conn, table))
+    if not existing:
+        raise IngestError(f"Table {table} does not exist")
+    header, raw_rows, first_line = parse_upload(stream, fmt)
+    unknown = [name for name in header if name not in existing]
+    if unknown:
+        raise IngestError(f"Columns not in {table}: {', '.join(unknown)}")
+
+    errors = []
+    columns = [(name, existing[name]) for name in header]
+    rows = typed_rows(raw_rows, columns, first_line, errors)
+    report = load_rows(conn, table, header, rows, "append", chunk_size, on_chunk)
+    if errors:
+        shown = errors[:MAX_REPORTED_ERRORS]
+        more = len(errors) - len(shown)
+        raise IngestError("\n".join(shown + ([f"… and {more} more"] if more else [])))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream CSV files into the SQLite database.")
+    parser.add_argument("csv_path", nargs="+", help="CSV file(s) to load")
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite database path (default: {DB_PATH})")
+    parser.add_argument("--table", help="Target table (default: inferred from the file name)")
+    parser.add_argument("--mode", choices=MODES, default="replace",
+                        help="replace the table, append rows, or upsert on the primary key")
+    parser.add_argument("--create-key", action="store_true",
+                        help="with --mode upsert, add a UNIQUE index on the primary-key columns if the table lacks one")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows per executemany batch")
+    parser.add_argument("--delimiter", default=",", help="field delimiter (use '\\t' for TSV)")
+    args = parser.parse_args(argv)
+
+    if args.table and len(args.csv_path) > 1:
+        parser.error("--table can only be used with a single CSV file")
+    delimiter = "\t" if args.delimiter == "\\t" else args.delimiter
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        for csv_path in args.csv_path:
+            table = args.table or DEFAULT_CSV_TABLES.get(
+                os.path.basename(csv_path), os.path.splitext(os.path.basename(csv_path))[0]
+            )
+            try:
+                with conn:
+                    report = ingest_csv(conn, csv_path, table, args.mode, args.chunk_size, delimiter,
+                                        create_key=args.create_key)
+            except (IngestError, sqlite3.Error, OSError) as e:
+                print(f"Failed to load {csv_path}: {e}", file=sys.stderr)
+                return 1
+            print(f"Loaded {report.rows:,} rows into '{report.table}' in {report.seconds:.2f}s "
+                  f"({rows_per_sec(report):,.0f} rows/sec)")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
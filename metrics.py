@@ -0,0 +1,248 @@
+import bisect
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+
+# --- Query Instrumentation ---
+# Every connection the app opens is a TracingConnection. Its cursors time each
+# statement from execute() until the result is exhausted (or the cursor is
+# reused/closed), count the rows returned and tag the record with the page
+# that issued it. Slow statements are queued for the persistent slow-query
+# log, which is written outside the traced call to avoid nesting writes.
+SLOW_QUERY_MS = 100
+RECENT_LIMIT = 5000
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+PROMETHEUS_PATH = "metrics.prom"
+
+SLOW_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_slow_queries (
+    id INTEGER PRIMARY KEY,
+    logged_at REAL NOT NULL,
+    page TEXT,
+    sql TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    rows INTEGER,
+    plan TEXT
+)
+"""
+
+_local = threading.local()
+
+
+def set_page(page):
+    """Tag statements issued from the current thread with ``page``."""
+    _local.page = page
+
+
+def current_page():
+    return getattr(_local, "page", None) or "background"
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, recent_limit=RECENT_LIMIT):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=recent_limit)
+        self.query_latency = defaultdict(Histogram)
+        self.rerun_latency = defaultdict(Histogram)
+        # A session's first run, which pays for any page module imports
+        self.first_render = defaultdict(Histogram)
+        self.page_imports = {}
+        self.rows_returned = defaultdict(int)
+        self._pending_slow = []
+
+    def record_query(self, page, sql, params, seconds, rows):
+        record = {"at": time.time(), "page": page, "sql": sql, "ms": seconds * 1000, "rows": rows}
+        with self._lock:
+            self.recent.append(record)
+            self.query_latency[page].observe(seconds)
+            self.rows_returned[page] += max(rows, 0)
+            if record["ms"] >= self.slow_query_ms and not sql.lstrip().upper().startswith("EXPLAIN"):
+                self._pending_slow.append((record, params))
+
+    def record_rerun(self, page, seconds, first=False):
+        with self._lock:
+            self.rerun_latency[page].observe(seconds)
+            if first:
+                self.first_render[page].observe(seconds)
+
+    def record_page_import(self, page, seconds):
+        with self._lock:
+            self.page_imports[page] = seconds
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.recent)
+
+    def has_pending_slow(self):
+        return bool(self._pending_slow)
+
+    def flush_slow_log(self, conn):
+        """Write queued slow statements, with their query plans, to app_slow_queries."""
+        with self._lock:
+            pending, self._pending_slow = self._pending_slow, []
+        if not pending:
+            return 0
+        conn.execute(SLOW_LOG_SCHEMA)
+        for record, params in pending:
+            try:
+                plan = "\n".join(r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {record['sql']}", params or ()))
+            except sqlite3.Error:
+                plan = None
+            conn.execute(
+                "INSERT INTO app_slow_queries (logged_at, page, sql, duration_ms, rows, plan) VALUES (?, ?, ?, ?, ?, ?)",
+                (record["at"], record["page"], record["sql"], record["ms"], record["rows"], plan),
+            )
+        return len(pending)
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            for name, help_text, histograms in (
+                ("xploria_sql_query_duration_seconds", "SQL statement latency by page.", self.query_latency),
+                ("xploria_script_run_duration_seconds", "Streamlit script rerun time by page.", self.rerun_latency),
+                ("xploria_first_render_duration_seconds", "First script run of a session by page.",
+                 self.first_render),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for page, hist in sorted(histograms.items()):
+                    label = _label(page)
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets + [float("inf")], hist.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{name}_bucket{{page="{label}",le="{le}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{page="{label}"}} {hist.total}')
+                    lines.append(f'{name}_count{{page="{label}"}} {hist.count}')
+            lines += ["# HELP xploria_sql_rows_returned_total Rows returned by SQL statements by page.",
+                      "# TYPE xploria_sql_rows_returned_total counter"]
+            for page, rows in sorted(self.rows_returned.items()):
+                lines.append(f'xploria_sql_rows_returned_total{{page="{_label(page)}"}} {rows}')
+            lines += ["# HELP xploria_page_import_seconds Time to import a page's module on first use.",
+                      "# TYPE xploria_page_import_seconds gauge"]
+            for page, seconds in sorted(self.page_imports.items()):
+                lines.append(f'xploria_page_import_seconds{{page="{_label(page)}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path=PROMETHEUS_PATH):
+        # Write then rename so a scraper never reads a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+        return path
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+class TracingCursor(sqlite3.Cursor):
+    _trace = None
+
+    def _finish(self):
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            page, sql, params, elapsed, rows = trace
+            registry.record_query(page, sql, params, elapsed, rows if self.description else self.rowcount)
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._trace is not None:
+                self._trace[3] += time.perf_counter() - started
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._trace = [current_page(), sql, parameters, 0.0, 0]
+        try:
+            self._timed(super().execute, sql, parameters)
+        except Exception:
+            self._finish()
+            raise
+        if not self.description:
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._trace = [current_page(), sql, None, 0.0, 0]
+        try:
+            self._timed(super().executemany, sql, seq_of_parameters)
+        finally:
+            self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._trace is not None:
+            self._trace[4] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if self._trace is not None:
+            self._trace[4] += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._trace is not None:
+            self._trace[4] += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+        if self._trace is not None:
+            self._trace[4] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass  # interpreter shutdown
+
+
+class TracingConnection(sqlite3.Connection):
+    def cursor(self, factory=None):
+        return super().cursor(factory or TracingCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,329 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from collections import Counter
+
+from advisor import time_query
+from db import DB_PATH, quote_ident
+from search import SEARCH_TABLE
+
+# --- Normalized CategoryAI ---
+# Moves CategoryAI into typed tables with lookup tables for the strings that
+# repeat on every row (category, tier, icon paths, URL prefixes, "Visit") and
+# a hashtag junction table, then replaces it with a view of the same name and
+# columns. rating_value is dropped: it is always rating_score formatted as
+# "x.y / 5.0" and the view rebuilds it. The migration runs on a compacted copy
+# of the database and is verified row by row against the original before it
+# is kept.
+SOURCE_TABLE = "CategoryAI"
+DEFAULT_OUTPUT = "data_normalized.db"
+FETCH_BATCH = 5000
+DEFAULT_REPEAT = 5
+# Tags may contain spaces ("#Sales & Marketing"), so split only before a "#"
+_TAG_BOUNDARY = re.compile(r"\s+(?=#)")
+
+NORMALIZED_SCHEMA = """
+CREATE TABLE ai_category (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE ai_tier (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE ai_string (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL UNIQUE
+);
+CREATE TABLE ai_tool (
+    id INTEGER PRIMARY KEY,
+    category_id INTEGER REFERENCES ai_category (id),
+    rank INTEGER,
+    rating_score REAL,
+    rating_stars INTEGER,
+    tier_id INTEGER REFERENCES ai_tier (id),
+    upvotes INTEGER,
+    title TEXT,
+    url_prefix_id INTEGER REFERENCES ai_string (id),
+    url_slug TEXT,
+    icon_prefix_id INTEGER REFERENCES ai_string (id),
+    icon_name TEXT,
+    verified_icon_id INTEGER REFERENCES ai_string (id),
+    upvote_icon_id INTEGER REFERENCES ai_string (id),
+    visit_icon_id INTEGER REFERENCES ai_string (id),
+    visit_text_id INTEGER REFERENCES ai_string (id),
+    description TEXT,
+    UNIQUE (category_id, rank)
+);
+CREATE INDEX ai_tool_tier ON ai_tool (tier_id);
+CREATE TABLE ai_hashtag (
+    id INTEGER PRIMARY KEY,
+    tag TEXT NOT NULL UNIQUE
+);
+CREATE TABLE ai_tool_hashtag (
+    tool_id INTEGER NOT NULL REFERENCES ai_tool (id),
+    position INTEGER NOT NULL,
+    hashtag_id INTEGER NOT NULL REFERENCES ai_hashtag (id),
+    PRIMARY KEY (tool_id, position)
+) WITHOUT ROWID;
+CREATE INDEX ai_tool_hashtag_tag ON ai_tool_hashtag (hashtag_id, tool_id);
+"""
+
+# Column for column what CategoryAI held; description sits last in ai_tool so
+# scans that skip it never decode the long text
+COMPAT_SELECT = """
+SELECT {id_column}c.name AS category,
+       t.rank,
+       t.rating_score,
+       t.rating_stars,
+       CASE WHEN t.rating_score IS NOT NULL THEN printf('%.1f / 5.0', t.rating_score) END AS rating_value,
+       r.name AS tier,
+       ip.value || t.icon_name AS icon_url,
+       t.title,
+       up.value || t.url_slug AS tool_url,
+       vi.value AS verified_icon,
+       t.description,
+       (SELECT group_concat(tag, ' ') FROM (
+            SELECT h.tag FROM ai_tool_hashtag th JOIN ai_hashtag h ON h.id = th.hashtag_id
+            WHERE th.tool_id = t.id ORDER BY th.position)) AS hashtags,
+       ui.value AS upvote_icon,
+       t.upvotes,
+       si.value AS visit_icon,
+       st.value AS visit_text
+FROM ai_tool t
+LEFT JOIN ai_category c ON c.id = t.category_id
+LEFT JOIN ai_tier r ON r.id = t.tier_id
+LEFT JOIN ai_string ip ON ip.id = t.icon_prefix_id
+LEFT JOIN ai_string up ON up.id = t.url_prefix_id
+LEFT JOIN ai_string vi ON vi.id = t.verified_icon_id
+LEFT JOIN ai_string ui ON ui.id = t.upvote_icon_id
+LEFT JOIN ai_string si ON si.id = t.visit_icon_id
+LEFT JOIN ai_string st ON st.id = t.visit_text_id
+"""
+
+SOURCE_COLUMNS = ["category", "rank", "rating_score", "rating_stars", "rating_value", "tier", "icon_url", "title",
+                  "tool_url", "verified_icon", "description", "hashtags", "upvote_icon", "upvotes", "visit_icon",
+                  "visit_text"]
+
+# (name, query on the original table, query on the normalized tables)
+COMPARISON_QUERIES = [
+    ("category_rollup",
+     "SELECT category, COUNT(*), AVG(rating_score), SUM(upvotes) FROM CategoryAI GROUP BY category",
+     "SELECT c.name, COUNT(*), AVG(t.rating_score), SUM(t.upvotes) "
+     "FROM ai_tool t JOIN ai_category c ON c.id = t.category_id GROUP BY c.name"),
+    ("tier_filter",
+     "SELECT title, upvotes FROM CategoryAI WHERE tier = 'Free'",
+     "SELECT t.title, t.upvotes FROM ai_tool t JOIN ai_tier r ON r.id = t.tier_id WHERE r.name = 'Free'"),
+    ("hashtag_lookup",
+     "SELECT title FROM CategoryAI WHERE ' ' || hashtags || ' ' LIKE '% ' || :tag || ' %'",
+     "SELECT t.title FROM ai_hashtag h JOIN ai_tool_hashtag th ON th.hashtag_id = h.id "
+     "JOIN ai_tool t ON t.id = th.tool_id WHERE h.tag = :tag"),
+    ("full_read",
+     "SELECT * FROM CategoryAI",
+     None),  # the same statement through the compatibility view
+]
+
+
+class MigrationError(Exception):
+    pass
+
+
+def split_path(url):
+    """Split a URL before its last path segment, keeping a trailing slash with the segment."""
+    if url is None:
+        return None, None
+    cut = url.rfind("/", 0, len(url) - 1) + 1
+    return url[:cut], url[cut:]
+
+
+class _Lookup:
+    """Interns strings into a lookup table, caching the ids in memory."""
+
+    def __init__(self, conn, table, column):
+        self.conn = conn
+        self.sql = f"INSERT INTO {table} ({column}) VALUES (?)"
+        self.ids = {}
+
+    def __call__(self, value):
+        if value is None:
+            return None
+        if value not in self.ids:
+            self.ids[value] = self.conn.execute(self.sql, (value,)).lastrowid
+        return self.ids[value]
+
+
+def populate(conn):
+    """Copy CategoryAI into the normalized tables, keeping each row's rowid as its id."""
+    # Statement by statement: executescript would commit the caller's transaction
+    for statement in NORMALIZED_SCHEMA.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+    category = _Lookup(conn, "ai_category", "name")
+    tier = _Lookup(conn, "ai_tier", "name")
+    string = _Lookup(conn, "ai_string", "value")
+    hashtag = _Lookup(conn, "ai_hashtag", "tag")
+
+    column_list = ", ".join(quote_ident(c) for c in SOURCE_COLUMNS)
+    cursor = conn.execute(f"SELECT rowid, {column_list} FROM {quote_ident(SOURCE_TABLE)} ORDER BY rowid")
+    tools = 0
+    while True:
+        batch = cursor.fetchmany(FETCH_BATCH)
+        if not batch:
+            break
+        tool_rows, tag_rows = [], []
+        for rowid, *values in batch:
+            row = dict(zip(SOURCE_COLUMNS, values))
+            url_prefix, url_slug = split_path(row["tool_url"])
+            icon_prefix, icon_name = split_path(row["icon_url"])
+            tool_rows.append((
+                rowid, category(row["category"]), row["rank"], row["rating_score"], row["rating_stars"],
+                tier(row["tier"]), row["upvotes"], row["title"], string(url_prefix), url_slug,
+                string(icon_prefix), icon_name, string(row["verified_icon"]), string(row["upvote_icon"]),
+                string(row["visit_icon"]), string(row["visit_text"]), row["description"],
+            ))
+            for position, tag in enumerate(split_hashtags(row["hashtags"])):
+                tag_rows.append((rowid, position, hashtag(tag)))
+        conn.executemany(f"INSERT INTO ai_tool VALUES ({', '.join('?' * 17)})", tool_rows)
+        conn.executemany("INSERT INTO ai_tool_hashtag (tool_id, position, hashtag_id) VALUES (?, ?, ?)", tag_rows)
+        tools += len(tool_rows)
+    return tools
+
+
+def verify(conn):
+    """Compare every row of the original table with what the view will return."""
+    column_list = ", ".join(quote_ident(c) for c in SOURCE_COLUMNS)
+    original = conn.execute(f"SELECT rowid, {column_list} FROM {quote_ident(SOURCE_TABLE)} ORDER BY rowid")
+    rebuilt = conn.execute(COMPAT_SELECT.format(id_column="t.id, ") + " ORDER BY t.id")
+    for before, after in zip(original, rebuilt):
+        if tuple(before) != tuple(after):
+            diff = [name for name, a, b in zip(["rowid"] + SOURCE_COLUMNS, before, after) if a != b]
+            raise MigrationError(f"Row {before[0]} does not round-trip (columns: {', '.join(diff)})")
+    if original.fetchone() is not None or rebuilt.fetchone() is not None:
+        raise MigrationError("Row counts differ between CategoryAI and the normalized tables")
+
+
+def drop_derived(conn):
+    """Drop app structures built on the CategoryAI table; the app rebuilds what it can."""
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    summaries = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'app!_mv!_%' ESCAPE '!'"
+    ).fetchall()
+    for (name,) in summaries:
+        conn.execute(f"DROP TABLE {quote_ident(name)}")
+
+
+def split_hashtags(hashtags):
+    hashtags = (hashtags or "").strip()
+    return _TAG_BOUNDARY.split(hashtags) if hashtags else []
+
+
+def most_common_hashtag(conn):
+    tags = Counter()
+    for (hashtags,) in conn.execute(f"SELECT hashtags FROM {quote_ident(SOURCE_TABLE)}"):
+        tags.update(split_hashtags(hashtags))
+    return tags.most_common(1)[0][0] if tags else ""
+
+
+def time_queries(conn, queries, tag, repeat):
+    timings = {}
+    for name, sql in queries:
+        sql = sql.replace(":tag", "'" + tag.replace("'", "''") + "'")
+        timings[name] = time_query(conn, sql, repeat, timeout_s=None, max_rows=None)
+    return timings
+
+
+def migrate(source_path, output_path, repeat=DEFAULT_REPEAT):
+    """Write a normalized copy of ``source_path`` to ``output_path``; return the comparison report."""
+    if os.path.exists(output_path):
+        raise MigrationError(f"{output_path} already exists; remove it or choose another --output")
+    source = sqlite3.connect(source_path)
+    try:
+        if not source.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name = ?",
+                              (SOURCE_TABLE,)).fetchone():
+            raise MigrationError(f"{source_path} has no {SOURCE_TABLE} table")
+        source.execute("VACUUM INTO ?", (output_path,))
+    finally:
+        source.close()
+
+    conn = sqlite3.connect(output_path, isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        drop_derived(conn)
+        conn.execute("COMMIT")
+        conn.execute("VACUUM")
+        size_before = os.path.getsize(output_path)
+        tag = most_common_hashtag(conn)
+        before = time_queries(conn, [(n, old) for n, old, _ in COMPARISON_QUERIES], tag, repeat)
+
+        conn.execute("BEGIN")
+        tools = populate(conn)
+        verify(conn)
+        conn.execute(f"DROP TABLE {quote_ident(SOURCE_TABLE)}")
+        conn.execute(f"CREATE VIEW {quote_ident(SOURCE_TABLE)} AS {COMPAT_SELECT.format(id_column='')}")
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+        size_after = os.path.getsize(output_path)
+
+        through_view = time_queries(conn, [(n, old) for n, old, _ in COMPARISON_QUERIES], tag, repeat)
+        native = time_queries(conn, [(n, new) for n, _, new in COMPARISON_QUERIES if new], tag, repeat)
+    except BaseException:
+        conn.close()
+        os.remove(output_path)
+        raise
+    conn.close()
+
+    return {
+        "source": source_path,
+        "output": output_path,
+        "tools": tools,
+        "hashtag": tag,
+        "size_before": size_before,
+        "size_after": size_after,
+        "queries": [
+            {"name": name, "before_ms": before[name], "view_ms": through_view[name], "normalized_ms": native.get(name)}
+            for name, _, _ in COMPARISON_QUERIES
+        ],
+    }
+
+
+def _format_ms(ms, width):
+    return f"{ms:{width}.3f} ms" if ms is not None else f"{'-':>{width + 3}}"
+
+
+def print_report(report):
+    before, after = report["size_before"], report["size_after"]
+    print(f"Migrated {report['tools']:,} tools into {report['output']}")
+    print(f"File size: {before / 1024:,.0f} KiB -> {after / 1024:,.0f} KiB ({after / before - 1:+.0%})")
+    print(f"{'query':<18} {'before':>10} {'via view':>10} {'normalized':>11}")
+    for q in report["queries"]:
+        before_ms, view_ms = _format_ms(q["before_ms"], 7), _format_ms(q["view_ms"], 7)
+        print(f"{q['name']:<18} {before_ms} {view_ms} {_format_ms(q['normalized_ms'], 8)}")
+    print(f"(hashtag_lookup uses {report['hashtag']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Migrate {SOURCE_TABLE} to a normalized schema.")
+    parser.add_argument("--db", default=DB_PATH, help="database to read (left unchanged)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the normalized database")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per comparison query")
+    parser.add_argument("--report", help="also write the comparison as JSON to this path")
+    args = parser.parse_args(argv)
+
+    try:
+        report = migrate(args.db, args.output, args.repeat)
+    except (MigrationError, sqlite3.Error) as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 1
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import sqlite3
+from collections import namedtuple
+
+from db import quote_ident
+
+# --- Paging Settings ---
+PAGE_SIZES = [25, 50, 100, 250, 500]
+DEFAULT_PAGE_SIZE = 100
+
+Page = namedtuple("Page", ["columns", "rows", "first_key", "last_key", "has_prev", "has_next"])
+
+
+def has_rowid(conn, table):
+    try:
+        conn.execute(f"SELECT rowid FROM {quote_ident(table)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def estimate_row_count(conn, table):
+    """Cheap row-count estimate that never scans the table.
+
+    Prefers the ANALYZE statistics in sqlite_stat1 and falls back to the rowid
+    range, which SQLite answers from the ends of the table b-tree.
+    """
+    try:
+        row = conn.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NULL", (table,)
+        ).fetchone()
+        if row:
+            return int(row[0].split()[0])
+    except sqlite3.OperationalError:
+        pass  # no sqlite_stat1 until ANALYZE has run
+
+    if has_rowid(conn, table):
+        low, high = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote_ident(table)}").fetchone()
+        return 0 if high is None else high - low + 1
+    return conn.execute(f"SELECT COUNT(*) FROM {quote_ident(table)}").fetchone()[0]
+
+
+def fetch_page(conn, table, page_size, anchor=None, direction="next", rowid=None):
+    """Fetch one page of ``table`` relative to ``anchor``.
+
+    ``anchor`` is the last key of the previous page (``direction="next"``) or
+    the first key of the following page (``direction="prev"``); ``None``
+    starts from the beginning. Keys are rowids, so each page is a single
+    index range lookup no matter how deep into the table it is. Tables created
+    WITHOUT ROWID fall back to OFFSET paging, where the key is the row offset;
+    pass ``rowid`` when the caller already knows which kind ``table`` is.
+    """
+    name = quote_ident(table)
+    if rowid is None:
+        rowid = has_rowid(conn, table)
+
+    if not rowid:
+        offset = 0 if anchor is None else anchor
+        if direction == "prev":
+            offset = max(offset - page_size, 0)
+        cursor = conn.execute(f"SELECT * FROM {name} LIMIT ? OFFSET ?", (page_size + 1, offset))
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        return Page(columns, rows, offset, offset + len(rows), offset > 0, has_next)
+
+    # One extra row tells us whether another page exists in that direction
+    if direction == "prev" and anchor is not None:
+        cursor = conn.execute(
+            f"SELECT rowid, * FROM {name} WHERE rowid < ? ORDER BY rowid DESC LIMIT ?",
+            (anchor, page_size + 1),
+        )
+        rows = cursor.fetchall()
+        if len(rows) <= page_size:
+            # Reached the start of the table: show a full first page instead
+            return fetch_page(conn, table, page_size)
+        rows = rows[:page_size][::-1]
+        has_prev, has_next = True, True
+    else:
+        if anchor is None:
+            cursor = conn.execute(f"SELECT rowid, * FROM {name} ORDER BY rowid LIMIT ?", (page_size + 1,))
+        else:
+            cursor = conn.execute(
+                f"SELECT rowid, * FROM {name} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (anchor, page_size + 1),
+            )
+        rows = cursor.fetchall()
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_prev = anchor is not None
+
+    columns = [d[0] for d in cursor.description][1:]
+    first_key = rows[0][0] if rows else anchor
+    last_key = rows[-1][0] if rows else anchor
+    return Page(columns, [r[1:] for r in rows], first_key, last_key, has_prev, has_next)
@@ -0,0 +1,173 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+import streamlit as st
+
+# --- Cache Settings ---
+CACHE_MAX_ENTRIES = 64
+CACHE_TTL_SECONDS = 300
+
+_READ_ACTIONS = {sqlite3.SQLITE_READ}
+_WRITE_ACTIONS = {
+    sqlite3.SQLITE_INSERT,
+    sqlite3.SQLITE_UPDATE,
+    sqlite3.SQLITE_DELETE,
+    sqlite3.SQLITE_CREATE_TABLE,
+    sqlite3.SQLITE_DROP_TABLE,
+    sqlite3.SQLITE_CREATE_TEMP_TABLE,
+    sqlite3.SQLITE_DROP_TEMP_TABLE,
+}
+_TABLE_IN_ARG2 = {
+    sqlite3.SQLITE_ALTER_TABLE,
+    sqlite3.SQLITE_CREATE_INDEX,
+    sqlite3.SQLITE_DROP_INDEX,
+}
+
+# String literals and quoted identifiers are kept verbatim, everything else
+# is whitespace-collapsed and lower-cased
+_SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])|(\s+)|([^'"`\[\s]+|.)""")
+
+
+def normalize_sql(sql):
+    parts = []
+    for quoted, space, other in _SQL_TOKENS.findall(sql.strip().rstrip(";").strip()):
+        if quoted:
+            parts.append(quoted)
+        elif space:
+            parts.append(" ")
+        else:
+            parts.append(other.lower())
+    return "".join(parts)
+
+
+class TableAccess:
+    def __init__(self):
+        self.read = set()
+        self.written = set()
+
+
+def _qualified(db_name, table):
+    # Tables of ATTACHed databases are recorded as "alias.table"
+    return table if db_name in (None, "main", "temp") else f"{db_name}.{table}"
+
+
+@contextmanager
+def track_tables(conn):
+    """Record which tables the statements run on ``conn`` read and write.
+
+    Uses SQLite's authorizer callback, which fires while each statement is
+    prepared, so the result is exact even for joins, views and triggers.
+    """
+    access = TableAccess()
+
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action in _READ_ACTIONS and arg1:
+            access.read.add(_qualified(db_name, arg1))
+        elif action in _WRITE_ACTIONS and arg1 and not arg1.startswith("sqlite_"):
+            access.written.add(_qualified(db_name, arg1))
+        elif action in _TABLE_IN_ARG2 and arg2:
+            access.written.add(_qualified(db_name, arg2))
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        yield access
+    finally:
+        conn.set_authorizer(None)
+
+
+class QueryCache:
+    """Bounded LRU/TTL cache of query results.
+
+    Entries remember the tables they read and the change counter of each of
+    those tables at the time they were stored. A write invalidates only the
+    tables it touched by bumping their counters; stale entries are dropped
+    lazily on their next lookup. Writes by other processes are caught by the
+    database's data_version, which is stored with each entry, and results are
+    keyed by the row cap they were fetched under.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sql, max_rows=None, data_version=None):
+        """The cached result of ``sql`` under the ``max_rows`` cap, or None.
+
+        ``data_version`` is the pool's current ``external_version()``; entries
+        stored under a different one predate a write by another process.
+        """
+        key = (normalize_sql(sql), max_rows)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and data_version is not None:
+                result, versions, stored_version, stored_at = entry
+                fresh = time.monotonic() - stored_at <= self.ttl_seconds
+                if (fresh and stored_version == data_version
+                        and all(self._versions[t] == v for t, v in versions.items())):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, sql, result, tables, max_rows=None, data_version=None):
+        """Store ``result``; ``data_version`` must be read before the query ran."""
+        if data_version is None:
+            return
+        key = (normalize_sql(sql), max_rows)
+        with self._lock:
+            versions = {t.lower(): self._versions[t.lower()] for t in tables}
+            self._entries[key] = (result, versions, data_version, time.monotonic())
+            self._entries.move_to_end(key)
+            self._evict_overflow()
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table.lower()] += 1
+
+    def clear(self):
+        with self._lock:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+
+    def resize(self, max_entries):
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict_overflow()
+
+    def _evict_overflow(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_cache(path):
+    """The result cache for the database file at ``path``."""
+    return QueryCache()
@@ -0,0 +1,282 @@
+import itertools
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from metrics import current_page, set_page
+from query_cache import track_tables
+
+# --- Query Guardrails ---
+QUERY_TIMEOUT_S = 10
+MAX_ROWS = 10_000
+FETCH_BATCH = 500
+# SQLite VM instructions between checks of the time budget / cancel flag
+PROGRESS_STEPS = 10_000
+QUERY_WORKERS = 4
+MAX_JOBS_PER_SESSION = 3
+
+# ``stopped`` is None for a complete result, else "timeout" or "cancelled";
+# ``truncated`` is True when more rows existed beyond ``max_rows``
+QueryResult = namedtuple("QueryResult", ["columns", "rows", "truncated", "stopped", "elapsed"])
+# ``status`` is "ok", "failed" or "rolled back"; ``rows`` is rows returned or changed
+StatementResult = namedtuple("StatementResult", ["sql", "status", "rows", "elapsed", "error", "result"])
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?(?:\*/|$)", re.DOTALL)
+_TRANSACTION_CONTROL = re.compile(r"^\s*(BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE)\b", re.IGNORECASE)
+
+
+class ScriptError(Exception):
+    """A script statement failed; ``results`` covers every statement attempted."""
+
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+def split_statements(sql):
+    """Split a script into statements at the semicolons SQLite itself would end them on.
+
+    ``sqlite3.complete_statement`` understands string literals, quoted names,
+    comments and CREATE TRIGGER bodies, so semicolons inside those do not
+    split. A trailing statement without a semicolon is kept; comment-only
+    fragments are dropped.
+    """
+    statements, start = [], 0
+    for end, char in enumerate(sql):
+        if char == ";" and sqlite3.complete_statement(sql[start:end + 1]):
+            statements.append(sql[start:end + 1])
+            start = end + 1
+    statements.append(sql[start:])
+    cleaned = []
+    for statement in statements:
+        statement = statement.strip()
+        if _COMMENTS.sub("", statement).strip(" \t\r\n;"):
+            cleaned.append(statement[:-1].rstrip() if statement.endswith(";") else statement)
+    return cleaned
+
+
+@contextmanager
+def guarded(conn, timeout_s=QUERY_TIMEOUT_S, cancel_event=None):
+    """Abort statements on ``conn`` once ``timeout_s`` has passed or ``cancel_event`` is set.
+
+    Yields a list that gets "timeout" or "cancelled" appended when the
+    progress handler stops a statement; ``timeout_s=None`` means no budget.
+    """
+    deadline = time.monotonic() + timeout_s if timeout_s else None
+    reason = []
+
+    def check_budget():
+        if cancel_event is not None and cancel_event.is_set():
+            reason.append("cancelled")
+            return 1
+        if deadline is not None and time.monotonic() > deadline:
+            reason.append("timeout")
+            return 1
+        return 0
+
+    conn.set_progress_handler(check_budget, PROGRESS_STEPS)
+    try:
+        yield reason
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def run_guarded(conn, sql, timeout_s=QUERY_TIMEOUT_S, max_rows=MAX_ROWS, cancel_event=None,
+                batch_size=FETCH_BATCH, on_batch=None):
+    """Run ``sql`` under a time budget and row cap, streaming rows with fetchmany.
+
+    A progress handler aborts the statement once ``timeout_s`` has passed or
+    ``cancel_event`` is set; rows fetched before that are returned with
+    ``stopped`` set instead of being discarded; a ``timeout_s`` or ``max_rows``
+    of None lifts that limit. ``on_batch(columns, rows)`` is
+    called after every batch with the (growing) list of rows fetched so far.
+    """
+    started = time.perf_counter()
+    columns, rows, truncated = [], [], False
+    cursor = conn.cursor()
+    try:
+        with guarded(conn, timeout_s, cancel_event) as reason:
+            try:
+                cursor.execute(sql)
+                if cursor.description:
+                    columns = [d[0] for d in cursor.description]
+                    while True:
+                        # Ask for one row past the cap so truncation can be reported
+                        size = batch_size if max_rows is None else min(batch_size, max_rows + 1 - len(rows))
+                        batch = cursor.fetchmany(size)
+                        if not batch:
+                            break
+                        rows.extend(batch)
+                        if max_rows is not None and len(rows) > max_rows:
+                            del rows[max_rows:]
+                            truncated = True
+                            break
+                        if on_batch:
+                            on_batch(columns, rows)
+            except sqlite3.OperationalError:
+                if not reason:
+                    raise
+    finally:
+        cursor.close()
+
+    return QueryResult(columns, rows, truncated, reason[0] if reason else None, time.perf_counter() - started)
+
+
+def run_script(conn, statements, timeout_s=QUERY_TIMEOUT_S, max_rows=MAX_ROWS, continue_on_error=False):
+    """Run ``statements`` on a writable connection inside one transaction.
+
+    Each statement runs under its own savepoint and time budget. By default
+    the first failure raises ScriptError, and the caller rolls everything
+    back. With ``continue_on_error`` only the failing statement is rolled back
+    to its savepoint and the rest still run. Nothing is committed here.
+    """
+    for statement in statements:
+        match = _TRANSACTION_CONTROL.match(statement)
+        if match:
+            raise ScriptError(f"Run all manages the transaction itself; remove the {match.group(1).upper()} "
+                              "statement", [])
+
+    results = []
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    for i, statement in enumerate(statements):
+        savepoint = f"script_{i}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        changes_before = conn.total_changes
+        try:
+            result = run_guarded(conn, statement, timeout_s, max_rows)
+            if result.stopped:
+                raise sqlite3.OperationalError(f"stopped after the {timeout_s}s time budget")
+        except sqlite3.Error as e:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            results.append(StatementResult(statement, "failed", 0, 0.0, str(e), None))
+            if not continue_on_error:
+                results.extend(StatementResult(s, "rolled back", 0, 0.0, None, None) for s in statements[i + 1:])
+                raise ScriptError(f"Statement {i + 1} failed: {e}", results) from e
+            continue
+        conn.execute(f"RELEASE {savepoint}")
+        if result.columns:
+            rows = len(result.rows)
+        elif conn.total_changes != changes_before:
+            rows = conn.execute("SELECT changes()").fetchone()[0]
+        else:
+            rows = 0
+        results.append(StatementResult(statement, "ok", rows, result.elapsed, None, result))
+    return results
+
+
+def is_readonly_error(error):
+    """Whether ``error`` is a query_only reader refusing a write."""
+    return (isinstance(error, sqlite3.OperationalError)
+            and getattr(error, "sqlite_errorname", None) == "SQLITE_READONLY")
+
+
+class QueryJob:
+    """A guarded query run on the shared worker pool.
+
+    Each job reads through its own dedicated read-only connection, so queries
+    from several users (or several from one user) never queue behind each
+    other on a pooled connection. A ``write`` job runs on the pool's writer
+    instead, under the same budget and row cap, and rolls back if it is
+    stopped. Progress and the rows fetched so far can be read from the UI
+    thread while the job runs.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, sql, timeout_s=QUERY_TIMEOUT_S, max_rows=MAX_ROWS, write=False):
+        self.id = next(self._ids)
+        self.page = current_page()
+        self.sql = sql
+        self.timeout_s = timeout_s
+        self.max_rows = max_rows
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.columns = []
+        self._rows = []
+        self.result = None
+        self.error = None
+        self.write = write
+        # The pool's external_version() before the query ran, for the result cache
+        self.data_version = None
+        self.tables = set()
+        self.written = set()
+        # Set by the page once the result has been handled, so reruns don't repeat it
+        self.message = None
+
+    @property
+    def status(self):
+        if self.done.is_set():
+            return "done"
+        return "running" if self.started else "queued"
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_fetched(self):
+        return len(self._rows)
+
+    def partial_rows(self, limit=None):
+        # Copy so the worker can keep appending while the UI renders
+        return list(self._rows[:limit] if limit else self._rows)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _on_batch(self, columns, rows):
+        self.columns = columns
+        self._rows = rows
+
+    def run(self, pool):
+        set_page(self.page)
+        self.started = time.monotonic()
+        conn = None
+        try:
+            if self.cancel_event.is_set():
+                self.result = QueryResult([], [], False, "cancelled", 0.0)
+                return
+            if self.write:
+                with pool.writer() as writer, track_tables(writer) as access:
+                    self.result = run_guarded(writer, self.sql, self.timeout_s, self.max_rows,
+                                              self.cancel_event, on_batch=self._on_batch)
+                    if self.result.stopped:
+                        writer.rollback()
+                        access.written.clear()
+            else:
+                self.data_version = pool.external_version()
+                conn = pool.open_reader()
+                with track_tables(conn) as access:
+                    self.result = run_guarded(conn, self.sql, self.timeout_s, self.max_rows,
+                                              self.cancel_event, on_batch=self._on_batch)
+            self.tables, self.written = access.read, access.written
+            self.columns, self._rows = self.result.columns, self.result.rows
+        except Exception as e:
+            self.error = e
+        finally:
+            if conn is not None:
+                conn.close()
+            self.finished = time.monotonic()
+            self.done.set()
+
+    def submit(self, executor, pool):
+        executor.submit(self.run, pool)
+        return self
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_executor():
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="sql-query")
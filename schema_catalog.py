@@ -0,0 +1,127 @@
+import threading
+from collections import namedtuple
+
+import streamlit as st
+
+from db import quote_ident
+from paging import estimate_row_count, has_rowid
+
+# --- Schema Catalog ---
+# Table names, columns and indexes are read from sqlite_master/PRAGMA once and
+# shared by every page and session. Each lookup costs a single
+# PRAGMA schema_version read; SQLite bumps that counter on any DDL (Create
+# Table tab, SQL editor, index advisor, another process), which triggers a
+# reload. Row-count estimates change with ordinary writes, so they are
+# computed lazily and dropped per table by ``invalidate_rows``.
+ColumnInfo = namedtuple("ColumnInfo", ["name", "type", "notnull", "default", "pk"])
+IndexInfo = namedtuple("IndexInfo", ["name", "unique", "columns"])
+TableInfo = namedtuple("TableInfo", ["name", "columns", "indexes", "has_rowid"])
+# Tables maintained by SQLite or by the app's triggers; hidden from browsing and editing
+INTERNAL_PREFIXES = ("sqlite_", "app_")
+
+
+def virtual_names(rows):
+    """Names among ``(name, sql)`` sqlite_master rows that are virtual tables (FTS5 and the like)."""
+    return {name for name, sql in rows if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")}
+
+
+def _internal_names(rows):
+    """Names among ``(name, sql)`` rows that are internal tables or FTS shadow tables."""
+    virtual = virtual_names(rows)
+    return {
+        name for name, _ in rows
+        if name.lower().startswith(INTERNAL_PREFIXES) or name in virtual
+        or any(name.startswith(f"{v}_") for v in virtual)
+    }
+
+
+def _load_table(conn, name):
+    columns = [ColumnInfo(c[1], c[2], bool(c[3]), c[4], c[5])
+               for c in conn.execute(f"PRAGMA table_info({quote_ident(name)})")]
+    indexes = []
+    for index in conn.execute(f"PRAGMA index_list({quote_ident(name)})").fetchall():
+        index_columns = [c[2] for c in conn.execute(f"PRAGMA index_info({quote_ident(index[1])})")]
+        indexes.append(IndexInfo(index[1], bool(index[2]), index_columns))
+    return TableInfo(name, columns, indexes, has_rowid(conn, name))
+
+
+class SchemaCatalog:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self._tables = {}
+        self._internal = set()
+        self._virtual = set()
+        self._row_estimates = {}
+        self.loads = 0
+        self.hits = 0
+
+    def _current(self, conn):
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        with self._lock:
+            if version == self.version:
+                self.hits += 1
+                return self._tables
+        rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table'").fetchall()
+        tables = {name: _load_table(conn, name) for name, _ in rows}
+        with self._lock:
+            self.version, self._tables = version, tables
+            self._internal, self._virtual = _internal_names(rows), virtual_names(rows)
+            self._row_estimates = {}
+            self.loads += 1
+        return tables
+
+    def table_names(self, conn, include_internal=False):
+        """User tables; ``include_internal`` adds SQLite's, the app's and FTS shadow tables."""
+        tables = self._current(conn)
+        with self._lock:
+            internal = set() if include_internal else self._internal
+        return [name for name in tables if name not in internal]
+
+    def virtual_tables(self, conn):
+        """Names of the virtual tables, which cannot be indexed."""
+        self._current(conn)
+        with self._lock:
+            return set(self._virtual)
+
+    def table(self, conn, name):
+        """``TableInfo`` for ``name`` (case-insensitive), or None if there is no such table."""
+        tables = self._current(conn)
+        if name in tables:
+            return tables[name]
+        return next((info for key, info in tables.items() if key.lower() == str(name).lower()), None)
+
+    def columns(self, conn, name):
+        info = self.table(conn, name)
+        return info.columns if info else []
+
+    def row_estimate(self, conn, name):
+        self._current(conn)
+        with self._lock:
+            if name in self._row_estimates:
+                return self._row_estimates[name]
+        estimate = estimate_row_count(conn, name)
+        with self._lock:
+            self._row_estimates[name] = estimate
+        return estimate
+
+    def invalidate_rows(self, tables):
+        with self._lock:
+            lowered = {t.lower() for t in tables}
+            for name in [n for n in self._row_estimates if n.lower() in lowered]:
+                del self._row_estimates[name]
+
+    def invalidate(self):
+        with self._lock:
+            self.version = None
+
+    def stats(self):
+        with self._lock:
+            return {"schema_version": self.version, "tables": len(self._tables),
+                    "loads": self.loads, "hits": self.hits}
+
+
+@st.cache_resource(show_spinner=False)
+def get_schema_catalog(path):
+    """The catalog for the database file at ``path``."""
+    return SchemaCatalog()
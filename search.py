@@ -0,0 +1,135 @@
+import html
+import re
+import time
+
+from db import quote_ident
+
+# --- Full-Text Search ---
+# An external-content FTS5 index over CategoryAI. It stores only the inverted
+# index (the text stays in CategoryAI) and is kept in sync by triggers, so a
+# replaced table is detected by its missing triggers and rebuilt.
+SOURCE_TABLE = "CategoryAI"
+SEARCH_TABLE = "app_tool_search"
+SEARCH_COLUMNS = ["title", "description", "hashtags", "category"]
+# bm25 weights, in SEARCH_COLUMNS order: title matches count most
+COLUMN_WEIGHTS = [10.0, 1.0, 4.0, 2.0]
+RESULT_LIMIT = 50
+
+_MARK_START, _MARK_END = "\x02", "\x03"
+_TERM = re.compile(r"[\w#+.-]+", re.UNICODE)
+
+
+def search_index_ready(conn):
+    row = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN "
+        "('app_search_ins', 'app_search_del', 'app_search_upd')"
+    ).fetchone()
+    return row[0] == 3
+
+
+def build_search_index(conn):
+    """(Re)create the FTS5 table and its sync triggers, then rebuild it."""
+    source = quote_ident(SOURCE_TABLE)
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+    conn.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+            {columns},
+            content={source}, content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""")
+    conn.execute(f"""
+        CREATE TRIGGER app_search_ins AFTER INSERT ON {source} BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER app_search_del AFTER DELETE ON {source} BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER app_search_upd AFTER UPDATE ON {source} BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END""")
+    conn.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+    conn.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def ensure_search_index(pool):
+    with pool.reader() as conn:
+        ready = search_index_ready(conn)
+    if not ready:
+        with pool.writer() as conn:
+            if not search_index_ready(conn):
+                build_search_index(conn)
+
+
+def to_match_query(text):
+    """Turn free text into an FTS5 query where every term is a prefix match.
+
+    Terms are quoted so FTS5 syntax characters in user input (``-``, ``:``,
+    ``*`` ...) are matched literally instead of raising a syntax error.
+    """
+    terms = _TERM.findall(text)
+    return " AND ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def highlight_html(text):
+    """Escape FTS5 highlight output and turn its markers into <mark> tags."""
+    escaped = html.escape(text or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def filter_options(conn):
+    source = quote_ident(SOURCE_TABLE)
+    return {
+        "category": [r[0] for r in conn.execute(f"SELECT DISTINCT category FROM {source} ORDER BY 1")],
+        "tier": [r[0] for r in conn.execute(f"SELECT DISTINCT tier FROM {source} ORDER BY 1")],
+    }
+
+
+def search_tools(conn, text, categories=None, tiers=None, min_stars=0, limit=RESULT_LIMIT):
+    """Run a BM25-ranked search and return ``(rows, elapsed_ms)``.
+
+    Each row is a dict with the tool's fields plus ``title_html`` and
+    ``snippet_html`` carrying highlighted, HTML-escaped matches.
+    """
+    match = to_match_query(text)
+    if not match:
+        return [], 0.0
+
+    weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+    sql = f"""
+        SELECT c.title, c.category, c.tier, c.rating_stars, c.upvotes, c.tool_url, c.hashtags,
+               highlight({SEARCH_TABLE}, 0, ?, ?) AS title_hl,
+               snippet({SEARCH_TABLE}, 1, ?, ?, '…', 24) AS snippet_hl,
+               bm25({SEARCH_TABLE}, {weights}) AS score
+        FROM {SEARCH_TABLE}
+        JOIN {quote_ident(SOURCE_TABLE)} c ON c.rowid = {SEARCH_TABLE}.rowid
+        WHERE {SEARCH_TABLE} MATCH ?"""
+    params = [_MARK_START, _MARK_END, _MARK_START, _MARK_END, match]
+    if categories:
+        sql += f" AND c.category IN ({', '.join('?' * len(categories))})"
+        params += list(categories)
+    if tiers:
+        sql += f" AND c.tier IN ({', '.join('?' * len(tiers))})"
+        params += list(tiers)
+    if min_stars:
+        sql += " AND c.rating_stars >= ?"
+        params.append(min_stars)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+
+    started = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    columns = [d[0] for d in cursor.description]
+    rows = [dict(zip(columns, r)) for r in cursor.fetchall()]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    for row in rows:
+        row["title_html"] = highlight_html(row.pop("title_hl"))
+        row["snippet_html"] = highlight_html(row.pop("snippet_hl"))
+    return rows, elapsed_ms
@@ -0,0 +1,364 @@
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+import streamlit as st
+
+from db import DB_PATH, quote_ident
+
+# --- Similar Tools ---
+# Each CategoryAI row is turned into a sparse TF-IDF vector over hashed
+# features: words from the title and description, plus the row's hashtags and
+# category as features of their own. The index keeps all rows as one
+# L2-normalised CSR matrix (float32 weights, int32 columns), so the cosine
+# similarity of one tool against every other is a single gather and bincount.
+#
+# `python similar.py` is the offline stage: it stores each row's feature
+# counts in app_similar_vectors together with the change-log position they
+# reflect. The app loads those blobs instead of re-tokenising every row, and
+# both sides apply only the rows that triggers logged in app_similar_changes
+# since then. A NULL row_id in the log (queued when the triggers are
+# installed) means the whole table must be re-read. IDF weights depend on
+# every row, so they are recomputed on each sync; that is a vectorised pass
+# over the stored counts, not a re-read of the rows.
+SOURCE_TABLE = "CategoryAI"
+# Features are hashed into 2**20 buckets, so collisions between the table's
+# few thousand distinct terms are negligible
+FEATURE_BITS = 20
+# Hashtags and the category are curated labels; they count as much as two words
+LABEL_WEIGHT = 2
+TOP_K = 10
+CHANGE_LOG_KEEP = 50_000
+
+_TRIGGERS = ("app_similar_ins", "app_similar_del", "app_similar_upd")
+_WORD = re.compile(r"[a-z0-9]+")
+_HASHTAG = re.compile(r"#[^#]+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by can for from in into is it its of on or our that the their this to with your you "
+    "ai tool tools".split()
+)
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS app_similar_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        row_id INTEGER
+    )""",
+    """CREATE TABLE IF NOT EXISTS app_similar_vectors (
+        row_id INTEGER PRIMARY KEY,
+        features BLOB NOT NULL,
+        counts BLOB NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS app_similar_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_seq INTEGER NOT NULL,
+        feature_bits INTEGER NOT NULL,
+        built_at REAL NOT NULL
+    )""",
+)
+
+
+def _feature(token):
+    return zlib.crc32(token.encode("utf-8")) & ((1 << FEATURE_BITS) - 1)
+
+
+def row_features(title, category, description, hashtags):
+    """Sorted hashed feature ids (int32) and their counts (float32) for one row."""
+    counts = Counter()
+    for text in (title, description):
+        counts.update(_feature(word) for word in _WORD.findall((text or "").lower()) if word not in _STOP_WORDS)
+    for tag in _HASHTAG.findall(hashtags or ""):
+        counts[_feature(tag.strip().lower())] += LABEL_WEIGHT
+    if category:
+        counts[_feature(f"category:{category.strip().lower()}")] += LABEL_WEIGHT
+    features = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+    return features, np.fromiter((counts[f] for f in features.tolist()), dtype=np.float32, count=len(features))
+
+
+def _rows(conn, rowids=None):
+    sql = f"SELECT rowid, title, category, description, hashtags FROM {quote_ident(SOURCE_TABLE)}"
+    if rowids is None:
+        return conn.execute(sql)
+    return conn.execute(sql + " WHERE rowid IN (SELECT value FROM json_each(?))", (json.dumps(rowids),))
+
+
+def similar_ready(conn):
+    placeholders = ", ".join("?" * len(_TRIGGERS))
+    found = conn.execute(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type='trigger' AND name IN ({placeholders})", _TRIGGERS
+    ).fetchone()[0]
+    return found == len(_TRIGGERS)
+
+
+def install_similar_triggers(conn):
+    """Create the change log, vector store and triggers and queue a full rebuild. Needs a writable connection."""
+    source = quote_ident(SOURCE_TABLE)
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_similar_ins AFTER INSERT ON {source} BEGIN
+            INSERT INTO app_similar_changes (row_id) VALUES (NEW.rowid);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_similar_del AFTER DELETE ON {source} BEGIN
+            INSERT INTO app_similar_changes (row_id) VALUES (OLD.rowid);
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_similar_upd
+        AFTER UPDATE OF title, category, description, hashtags ON {source} BEGIN
+            INSERT INTO app_similar_changes (row_id) VALUES (OLD.rowid);
+            INSERT INTO app_similar_changes (row_id) SELECT NEW.rowid WHERE NEW.rowid IS NOT OLD.rowid;
+        END""")
+    conn.execute("INSERT INTO app_similar_changes (row_id) VALUES (NULL)")
+
+
+def prune_changes(conn, keep=CHANGE_LOG_KEEP):
+    """Trim the change log; an index or stored copy that falls behind the trimmed range rebuilds."""
+    conn.execute("DELETE FROM app_similar_changes WHERE seq <= (SELECT MAX(seq) FROM app_similar_changes) - ?",
+                 (keep,))
+
+
+def _pending_changes(conn, since):
+    """Row ids logged after ``since``, or None when they cannot be applied one by one; plus the log bounds."""
+    first, last = conn.execute("SELECT MIN(seq), MAX(seq) FROM app_similar_changes").fetchone()
+    if since is None or (first is not None and first > since + 1):
+        return None, first, last
+    changes = [r[0] for r in conn.execute("SELECT row_id FROM app_similar_changes WHERE seq > ?", (since,))]
+    if None in changes:
+        return None, first, last
+    return sorted(set(changes)), first, last
+
+
+def _stored_seq(conn):
+    row = conn.execute("SELECT last_seq, feature_bits FROM app_similar_state WHERE id = 1").fetchone()
+    return row[0] if row and row[1] == FEATURE_BITS else None
+
+
+def store_vectors(conn):
+    """Bring app_similar_vectors up to date with the table; returns (rows written, full rebuild).
+
+    Needs a writable connection; the caller commits.
+    """
+    if not similar_ready(conn):
+        install_similar_triggers(conn)
+    changed, _, last = _pending_changes(conn, _stored_seq(conn))
+    if changed is None:
+        conn.execute("DELETE FROM app_similar_vectors")
+        rows = _rows(conn)
+    else:
+        conn.execute("DELETE FROM app_similar_vectors WHERE row_id IN (SELECT value FROM json_each(?))",
+                     (json.dumps(changed),))
+        rows = _rows(conn, changed)
+    vectors = [(rowid, *(a.tobytes() for a in row_features(*values))) for rowid, *values in rows.fetchall()]
+    conn.executemany("INSERT INTO app_similar_vectors (row_id, features, counts) VALUES (?, ?, ?)", vectors)
+    conn.execute("INSERT OR REPLACE INTO app_similar_state (id, last_seq, feature_bits, built_at) "
+                 "VALUES (1, ?, ?, ?)", (last or 0, FEATURE_BITS, time.time()))
+    return len(vectors), changed is None
+
+
+class SimilarIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._features = {}  # rowid -> (feature ids, counts)
+        self.rowids = np.empty(0, dtype=np.int64)
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._columns = np.empty(0, dtype=np.int32)
+        self._weights = np.empty(0, dtype=np.float32)
+        self._row_of = np.empty(0, dtype=np.int32)
+        self.vocabulary = 0
+        self.last_seq = None
+        self.log_size = 0
+        self.loaded_from_store = False
+        self.rebuilds = 0
+        self.rows_applied = 0
+        self.sync_ms = 0.0
+        self.query_ms = 0.0
+
+    def _load_stored(self, conn):
+        """Start from the offline vectors if they are still reachable through the change log."""
+        try:
+            stored = _stored_seq(conn)
+        except sqlite3.OperationalError:
+            return False  # python similar.py has not been run on this database
+        first = conn.execute("SELECT MIN(seq) FROM app_similar_changes").fetchone()[0]
+        if stored is None or (first is not None and first > stored + 1):
+            return False
+        self._features = {
+            rowid: (np.frombuffer(features, dtype=np.int32), np.frombuffer(counts, dtype=np.float32))
+            for rowid, features, counts in conn.execute("SELECT row_id, features, counts FROM app_similar_vectors")
+        }
+        self.last_seq = stored
+        self.loaded_from_store = True
+        return True
+
+    def _rebuild_matrix(self):
+        """Recompute IDF weights and the normalised CSR matrix from the per-row counts."""
+        self.rowids = np.fromiter(sorted(self._features), dtype=np.int64, count=len(self._features))
+        entries = [self._features[rowid] for rowid in self.rowids.tolist()]
+        lengths = np.fromiter((len(f) for f, _ in entries), dtype=np.int64, count=len(entries))
+        self._indptr = np.concatenate(([0], np.cumsum(lengths)))
+        features = np.concatenate([f for f, _ in entries]) if entries else np.empty(0, dtype=np.int32)
+        counts = np.concatenate([c for _, c in entries]) if entries else np.empty(0, dtype=np.float32)
+        self._row_of = np.repeat(np.arange(len(entries), dtype=np.int32), lengths)
+        # Columns are renumbered to the distinct features present, so a query vector has vocabulary size
+        vocabulary, columns, doc_freq = np.unique(features, return_inverse=True, return_counts=True)
+        idf = (np.log((1 + len(entries)) / (1 + doc_freq)) + 1).astype(np.float32)
+        weights = (1 + np.log(counts, dtype=np.float32)) * idf[columns]
+        norms = np.sqrt(np.bincount(self._row_of, weights=weights * weights, minlength=len(entries)))
+        norms[norms == 0] = 1
+        self._weights = (weights / norms[self._row_of]).astype(np.float32)
+        self._columns = columns.astype(np.int32)
+        self.vocabulary = len(vocabulary)
+
+    def sync(self, conn):
+        """Bring the vectors up to date with the change log; returns rows re-read."""
+        started = time.perf_counter()
+        with self._lock:
+            # One read transaction so the rows and the log position agree
+            conn.execute("BEGIN")
+            try:
+                loaded = self.last_seq is None and self._load_stored(conn)
+                changed, first, last = _pending_changes(conn, self.last_seq)
+                if changed is None:
+                    self._features = {rowid: row_features(*values) for rowid, *values in _rows(conn)}
+                    applied = len(self._features)
+                    self.loaded_from_store = False
+                    self.rebuilds += 1
+                else:
+                    for rowid in changed:
+                        self._features.pop(rowid, None)
+                    for rowid, *values in _rows(conn, changed):
+                        self._features[rowid] = row_features(*values)
+                    applied = len(changed)
+                if applied or loaded:
+                    self._rebuild_matrix()
+                self.last_seq = last if last is not None else 0
+                self.log_size = last - first + 1 if last is not None else 0
+            finally:
+                conn.rollback()
+            self.rows_applied += applied
+            self.sync_ms = (time.perf_counter() - started) * 1000
+            return applied
+
+    def similar(self, rowid, k=TOP_K):
+        """The ``k`` tools most similar to ``rowid`` as (rowid, cosine) pairs, best first."""
+        started = time.perf_counter()
+        with self._lock:
+            slot = np.searchsorted(self.rowids, rowid)
+            if slot == len(self.rowids) or self.rowids[slot] != rowid:
+                return []
+            start, end = self._indptr[slot], self._indptr[slot + 1]
+            query = np.zeros(self.vocabulary, dtype=np.float32)
+            query[self._columns[start:end]] = self._weights[start:end]
+            # Rows are unit length, so the dot product with every row is its cosine similarity
+            scores = np.bincount(self._row_of, weights=self._weights * query[self._columns],
+                                 minlength=len(self.rowids))
+            scores[slot] = 0
+            k = min(k, len(scores) - 1)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            top = top[scores[top] > 0]
+            result = list(zip(self.rowids[top].tolist(), scores[top].tolist()))
+        self.query_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rows": len(self.rowids),
+                "vocabulary": self.vocabulary,
+                "nonzeros": len(self._weights),
+                "memory_bytes": sum(a.nbytes for a in (self.rowids, self._indptr, self._columns,
+                                                       self._weights, self._row_of)),
+                "from_store": self.loaded_from_store,
+                "rebuilds": self.rebuilds,
+                "rows_applied": self.rows_applied,
+                "sync_ms": self.sync_ms,
+                "query_ms": self.query_ms,
+            }
+
+
+def fetch_similar(conn, index, rowid, k=TOP_K):
+    """The ``k`` tools most similar to ``rowid``, best first, with their cosine similarity appended.
+
+    The table lists a tool once per category it appears in, so other listings
+    of the same tool are skipped and each tool is returned once.
+    """
+    matches = dict(index.similar(rowid, 4 * k))
+    rows = conn.execute(
+        f"SELECT rowid, title, category, tier, rating_score, upvotes, hashtags, tool_url "
+        f"FROM {quote_ident(SOURCE_TABLE)} WHERE rowid IN (SELECT value FROM json_each(?))",
+        (json.dumps([rowid, *matches]),),
+    ).fetchall()
+    source = next((r for r in rows if r[0] == rowid), None)
+    seen = {(source[1] or "").lower()} if source else set()
+    similar = []
+    for row in sorted((r for r in rows if r[0] in matches), key=lambda r: -matches[r[0]]):
+        name = (row[1] or "").lower()
+        if name in seen:
+            continue
+        seen.add(name)
+        similar.append((*row[1:], round(matches[row[0]], 3)))
+        if len(similar) == k:
+            break
+    return similar
+
+
+def ensure_similar(pool, index):
+    """Install the change triggers if needed, then sync ``index``."""
+    with pool.reader() as conn:
+        ready = similar_ready(conn)
+    if not ready:
+        with pool.writer() as conn:
+            if not similar_ready(conn):
+                install_similar_triggers(conn)
+    with pool.reader() as conn:
+        index.sync(conn)
+    if index.log_size > 2 * CHANGE_LOG_KEEP:
+        try:
+            with pool.writer() as conn:
+                prune_changes(conn)
+        except sqlite3.Error:
+            pass  # pruning is housekeeping; the next sync retries
+
+
+@st.cache_resource(show_spinner=False)
+def get_similar_index(path):
+    """The similar-tools index over the database file at ``path``."""
+    return SimilarIndex()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Build or update the stored similar-tools vectors for "
+                                                 f"{SOURCE_TABLE}.")
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite database path (default: {DB_PATH})")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    try:
+        started = time.perf_counter()
+        with conn:
+            written, full = store_vectors(conn)
+        stored = conn.execute("SELECT COUNT(*), SUM(LENGTH(features) + LENGTH(counts)) "
+                              "FROM app_similar_vectors").fetchone()
+    except sqlite3.Error as e:
+        print(f"Failed to build the similar-tools vectors: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+    print(f"{'Rebuilt' if full else 'Updated'} {written:,} row(s) in {time.perf_counter() - started:.2f}s; "
+          f"{stored[0]:,} vectors stored in {(stored[1] or 0) / 1024:,.0f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import sqlite3
+import time
+
+from db import quote_ident
+
+# --- Precomputed Statistics ---
+# Row counts (and the CategoryAI rating histogram) are kept current by
+# triggers, so the Analytics page reads one small table instead of running
+# COUNT(*) over every table on each rerun. Tables created or replaced later
+# are picked up by comparing PRAGMA schema_version with the last synced one.
+INTERNAL_PREFIXES = ("sqlite_", "app_")
+RATING_TABLE = "CategoryAI"
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_table_stats (
+    table_name TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS app_rating_counts (
+    rating_stars INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS app_stats_meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def is_internal_table(name):
+    return name.lower().startswith(INTERNAL_PREFIXES)
+
+
+def user_tables(conn):
+    names = conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()
+    return [n[0] for n in names if not is_internal_table(n[0])]
+
+
+def _synced_schema_version(conn):
+    try:
+        row = conn.execute("SELECT value FROM app_stats_meta WHERE key = 'schema_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None  # stats tables not installed yet
+    return row[0] if row else None
+
+
+def stats_stale(conn):
+    return _synced_schema_version(conn) != conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+def _triggers(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger'")}
+
+
+def _install_count_triggers(conn, table):
+    name, stats_key = quote_ident(table), table.replace("'", "''")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {quote_ident('app_count_ins_' + table)} AFTER INSERT ON {name}
+        BEGIN
+            UPDATE app_table_stats SET row_count = row_count + 1, updated_at = (julianday('now') - 2440587.5) * 86400.0
+            WHERE table_name = '{stats_key}';
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {quote_ident('app_count_del_' + table)} AFTER DELETE ON {name}
+        BEGIN
+            UPDATE app_table_stats SET row_count = row_count - 1, updated_at = (julianday('now') - 2440587.5) * 86400.0
+            WHERE table_name = '{stats_key}';
+        END""")
+    count = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+    conn.execute(
+        "INSERT OR REPLACE INTO app_table_stats (table_name, row_count, updated_at) VALUES (?, ?, ?)",
+        (table, count, time.time()),
+    )
+
+
+def _install_rating_triggers(conn):
+    name = quote_ident(RATING_TABLE)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_rating_ins AFTER INSERT ON {name}
+        WHEN NEW.rating_stars IS NOT NULL
+        BEGIN
+            INSERT INTO app_rating_counts (rating_stars, count) VALUES (NEW.rating_stars, 1)
+            ON CONFLICT (rating_stars) DO UPDATE SET count = count + 1;
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_rating_del AFTER DELETE ON {name}
+        WHEN OLD.rating_stars IS NOT NULL
+        BEGIN
+            UPDATE app_rating_counts SET count = count - 1 WHERE rating_stars = OLD.rating_stars;
+        END""")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS app_rating_upd AFTER UPDATE OF rating_stars ON {name}
+        WHEN OLD.rating_stars IS NOT NEW.rating_stars
+        BEGIN
+            UPDATE app_rating_counts SET count = count - 1 WHERE rating_stars = OLD.rating_stars;
+            INSERT INTO app_rating_counts (rating_stars, count)
+            SELECT NEW.rating_stars, 1 WHERE NEW.rating_stars IS NOT NULL
+            ON CONFLICT (rating_stars) DO UPDATE SET count = count + 1;
+        END""")
+    conn.execute("DELETE FROM app_rating_counts")
+    conn.execute(f"""
+        INSERT INTO app_rating_counts (rating_stars, count)
+        SELECT rating_stars, COUNT(*) FROM {name}
+        WHERE rating_stars IS NOT NULL GROUP BY rating_stars""")
+
+
+def sync_stats(conn):
+    """Install missing triggers and reseed counts for new or replaced tables.
+
+    Must run on a writable connection. Only tables whose triggers are missing
+    are recounted, so a sync after unrelated DDL is cheap.
+    """
+    conn.executescript(STATS_SCHEMA)
+    tables = user_tables(conn)
+    triggers = _triggers(conn)
+
+    for table in tables:
+        if "app_count_ins_" + table not in triggers or "app_count_del_" + table not in triggers:
+            _install_count_triggers(conn, table)
+    placeholders = ", ".join("?" * len(tables))
+    conn.execute(f"DELETE FROM app_table_stats WHERE table_name NOT IN ({placeholders})", tables)
+
+    if RATING_TABLE in tables and "app_rating_ins" not in triggers:
+        _install_rating_triggers(conn)
+    elif RATING_TABLE not in tables:
+        conn.execute("DELETE FROM app_rating_counts")
+
+    conn.execute(
+        "INSERT OR REPLACE INTO app_stats_meta (key, value) VALUES ('schema_version', ?)",
+        (conn.execute("PRAGMA schema_version").fetchone()[0],),
+    )
+
+
+def ensure_stats(pool):
+    with pool.reader() as conn:
+        stale = stats_stale(conn)
+    if stale:
+        with pool.writer() as conn:
+            if stats_stale(conn):
+                sync_stats(conn)
+
+
+def table_row_counts(conn):
+    return conn.execute("SELECT table_name, row_count FROM app_table_stats").fetchall()
+
+
+def rating_counts(conn):
+    return conn.execute("SELECT rating_stars, count FROM app_rating_counts WHERE count > 0").fetchall()
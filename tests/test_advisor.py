@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from advisor import query_plan, suggest_indexes, time_query
+from schema_catalog import SchemaCatalog
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE CategoryAI (category TEXT, title TEXT, upvotes INTEGER)")
+    conn.executemany("INSERT INTO CategoryAI VALUES (?, ?, ?)", [("Art", f"tool {i}", i) for i in range(100)])
+    yield conn
+    conn.close()
+
+
+def test_table_scan_is_flagged(conn):
+    plan = query_plan(conn, "SELECT title FROM CategoryAI ORDER BY upvotes")
+    assert [step.flag for step in plan if step.detail.startswith("SCAN")] == ["full scan"]
+
+
+@pytest.mark.parametrize("index_sql, sql", [
+    ("CREATE INDEX idx_CategoryAI_upvotes ON CategoryAI (upvotes)",
+     "SELECT title FROM CategoryAI ORDER BY upvotes"),
+    ("CREATE INDEX idx_CategoryAI_upvotes_title ON CategoryAI (upvotes, title)",
+     "SELECT title FROM CategoryAI ORDER BY upvotes"),
+])
+def test_index_scan_is_not_flagged(conn, index_sql, sql):
+    conn.execute(index_sql)
+    scans = [step for step in query_plan(conn, sql) if step.detail.startswith("SCAN")]
+    assert scans and all(" USING " in step.detail for step in scans)
+    assert [step.flag for step in scans] == [None] * len(scans)
+
+
+@pytest.fixture
+def fts(conn):
+    conn.execute("CREATE VIRTUAL TABLE app_tool_search USING fts5(title)")
+    conn.execute("INSERT INTO app_tool_search (rowid, title) SELECT rowid, title FROM CategoryAI")
+    return conn
+
+
+@pytest.mark.parametrize("sql, name", [
+    ("SELECT 1", "CONSTANT"),
+    ("SELECT * FROM (SELECT category, count(*) AS n FROM CategoryAI GROUP BY category) ORDER BY n",
+     "(subquery-"),
+    ("WITH c AS MATERIALIZED (SELECT category FROM CategoryAI) SELECT * FROM c", "c"),
+    ("SELECT title FROM app_tool_search WHERE app_tool_search MATCH 'tool'", "app_tool_search"),
+    ("SELECT value FROM json_each('[1, 2, 3]')", "json_each"),
+])
+def test_non_table_scan_is_not_flagged(fts, sql, name):
+    scans = [step for step in query_plan(fts, sql) if step.detail.startswith(f"SCAN {name}")]
+    assert scans
+    assert [step.flag for step in scans] == [None] * len(scans)
+
+
+@pytest.mark.parametrize("use_catalog", [False, True])
+def test_no_index_suggested_for_virtual_table(fts, use_catalog):
+    catalog = SchemaCatalog() if use_catalog else None
+    sql = "SELECT title FROM app_tool_search WHERE app_tool_search MATCH 'tool' ORDER BY rank"
+    assert suggest_indexes(fts, sql, catalog=catalog) == []
+
+
+def test_time_query_can_run_unbounded(conn):
+    assert time_query(conn, "SELECT * FROM CategoryAI", 2, timeout_s=None, max_rows=None) is not None
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from facets import FacetIndex, fetch_tools, install_facet_triggers
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    conn.execute("CREATE TABLE CategoryAI (title TEXT, category TEXT, tier TEXT, hashtags TEXT, "
+                 "rating_score REAL, upvotes INTEGER, tool_url TEXT)")
+    conn.execute("INSERT INTO CategoryAI (rowid, title, category, upvotes) "
+                 "VALUES (5, 'a', 'Art', 1), (10000000000, 'b', 'Art', 2), (7, 'c', 'Code', 3)")
+    install_facet_triggers(conn)
+    yield conn
+    conn.close()
+
+
+def test_sparse_rowids_use_dense_slots(conn):
+    index = FacetIndex()
+    index.sync(conn)
+    counts, matched = index.query({"category": ["Art"]})
+    assert counts["category"] == {"Art": 2, "Code": 1}
+    assert matched.bit_length() <= 3
+    assert [row[1] for row in fetch_tools(conn, index.rowids(matched))] == ["b", "a"]
+
+
+def test_changes_keep_slots_decodable(conn):
+    index = FacetIndex()
+    index.sync(conn)
+    conn.execute("DELETE FROM CategoryAI WHERE rowid = 5")
+    conn.execute("UPDATE CategoryAI SET category = 'Art' WHERE rowid = 7")
+    index.sync(conn)
+    _, matched = index.query({"category": ["Art"]})
+    assert sorted(index.rowids(matched).tolist()) == [7, 10000000000]
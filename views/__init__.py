@@ -0,0 +1,47 @@
+import importlib
+import os
+import re
+import sys
+import time
+
+import streamlit as st
+
+from metrics import registry
+
+# --- Pages ---
+# One module per navigation entry, each exposing ``render(pool)``. A page's
+# module (and whatever it imports: pandas, altair, streamlit_ace, pyarrow) is
+# only imported the first time that page is opened in the process, so the
+# Home page renders without paying for the dashboards' dependencies. Python
+# keeps the module in sys.modules, so later reruns skip the import entirely.
+PAGES = {
+    "Home": ("home", "house-fill"),
+    "Database Tables": ("table_viewer", "table"),
+    "Search Tools": ("search_tools", "search"),
+    "Explore Tools": ("explore", "funnel-fill"),
+    "SQL Query Editor": ("sql_editor", "terminal"),
+    "Database Designer": ("designer", "database"),
+    "Analytics & Insights": ("insights", "bar-chart-line-fill"),
+    "Databases": ("databases", "hdd-stack"),
+    "Performance Monitor": ("monitor", "speedometer2"),
+}
+STYLESHEET = os.path.join(os.path.dirname(__file__), "style.css")
+
+
+def load(page):
+    """The module rendering ``page``, importing it on first use."""
+    name = f"{__name__}.{PAGES[page][0]}"
+    module = sys.modules.get(name)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        registry.record_page_import(page, time.perf_counter() - started)
+    return module
+
+
+@st.cache_resource(show_spinner=False)
+def stylesheet():
+    """The shared CSS as one minified ``<style>`` block, read from disk once per process."""
+    with open(STYLESHEET, encoding="utf-8") as f:
+        css = re.sub(r"/\*.*?\*/", "", f.read(), flags=re.S)
+    return "<style>" + re.sub(r"\s*([{}:;,>])\s*|\s+", lambda m: m.group(1) or " ", css).strip() + "</style>"
@@ -0,0 +1,44 @@
+import os
+
+import streamlit as st
+
+from export import EXPORT_FORMATS, ExportJob, cleanup_exports
+from query_runner import get_query_executor
+
+
+def export_controls(pool, sql, name, key):
+    """Stream the full result of ``sql`` to a temp file and offer it for download."""
+    exports = st.session_state.setdefault("exports", {})
+    format_col, button_col = st.columns([3, 1])
+    export_format = format_col.selectbox("Format", list(EXPORT_FORMATS), key=f"{key}_format")
+    if button_col.button("Prepare export", key=f"{key}_prepare", width="stretch"):
+        previous = exports.pop(key, None)
+        if previous:
+            previous.discard()
+        cleanup_exports()
+        # Runs on the shared worker pool so the page stays responsive and the export can be cancelled
+        exports[key] = ExportJob(sql, export_format).submit(get_query_executor(), pool)
+
+    job = exports.get(key)
+    if job is None or job.sql != sql:
+        return
+    if not job.done.is_set():
+        @st.fragment(run_every=0.5)
+        def export_progress():
+            if job.done.is_set():
+                st.rerun()
+            info_col, cancel_col = st.columns([5, 1])
+            info_col.caption(f"Exporting as {job.format}: {job.rows_written:,} rows written…")
+            if cancel_col.button("Cancel", key=f"{key}_cancel"):
+                job.cancel()
+
+        export_progress()
+    elif job.error is not None:
+        st.error(f"Export failed: {job.error}")
+    elif os.path.exists(job.report.path):
+        report = job.report
+        extension, mime = EXPORT_FORMATS[report.format]
+        with open(report.path, "rb") as f:
+            st.download_button(f"Download {report.rows:,} rows as {report.format} ({report.bytes / 1024:,.0f} KiB)",
+                               f, file_name=f"{name}.{extension}", mime=mime, key=f"{key}_download")
+        st.caption(f"Written in {report.seconds:.2f}s")
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+
+import pandas as pd
+import streamlit as st
+
+from grid import render_grid
+from schema_catalog import get_schema_catalog
+from workspace import (MAINTENANCE_ACTIONS, WORKSPACE_DIR, WorkspaceError, create_database, discover, file_stats,
+                       run_maintenance)
+
+
+# --- Page: Databases ---
+def render(pool):
+    st.markdown("<h1>Databases</h1>", unsafe_allow_html=True)
+    st.caption(f"SQLite files in `{os.path.abspath(WORKSPACE_DIR)}`. Pick the active one in the sidebar; "
+               "the others are attached to it for cross-database queries.")
+
+    stats = []
+    for path in discover():
+        try:
+            stats.append(file_stats(path))
+        except sqlite3.Error as e:
+            st.warning(f"{os.path.basename(path)}: {e}")
+    if stats:
+        aliases = {os.path.abspath(path): alias for alias, path in pool.attached}
+        df_files = pd.DataFrame([{
+            "File": os.path.basename(s["path"]),
+            "Schema": "main" if os.path.abspath(s["path"]) == os.path.abspath(pool.path)
+                      else aliases.get(os.path.abspath(s["path"]), "–"),
+            "Tables": s["tables"],
+            "Size MiB": round(s["file_bytes"] / 1024 ** 2, 2),
+            "WAL MiB": round(s["wal_bytes"] / 1024 ** 2, 2),
+            "Page size": s["page_size"],
+            "Pages": s["page_count"],
+            "Free pages": s["freelist_count"],
+            "Free %": round(s["free_fraction"] * 100, 1),
+        } for s in stats])
+        render_grid(df_files)
+
+    for alias, error in pool.attach_errors.items():
+        st.warning(f"Could not attach `{alias}`: {error}")
+    if pool.attached:
+        alias = pool.attached[0][0]
+        st.markdown("**Cross-database queries**")
+        st.caption("Qualify tables with their schema name in the SQL Query Editor, for example:")
+        st.code(f"SELECT m.title, m.category, o.category AS {alias}_category\nFROM main.CategoryAI AS m\n"
+                f"JOIN {alias}.CategoryAI AS o ON o.tool_url = m.tool_url", language="sql")
+
+    st.markdown(f"**Maintenance** for `{os.path.basename(pool.path)}`")
+    st.caption("VACUUM rewrites the file without its free pages, ANALYZE refreshes the planner's statistics and "
+               "PRAGMA optimize re-analyzes only the tables that need it.")
+    for column, action in zip(st.columns(len(MAINTENANCE_ACTIONS)), MAINTENANCE_ACTIONS):
+        if column.button(action, width="stretch"):
+            try:
+                with st.spinner(f"Running {action}..."):
+                    seconds, freed = run_maintenance(pool, action)
+                get_schema_catalog(pool.path).invalidate()
+                message = f"{action} finished in {seconds:.2f} s"
+                if action == "VACUUM":
+                    message += f", {max(freed, 0) / 1024 ** 2:,.2f} MiB freed"
+                st.success(message + ".")
+            except sqlite3.Error as e:
+                st.error(f"{action} failed: {e}")
+
+    st.markdown("**New database**")
+    name_col, create_col = st.columns([3, 1])
+    name = name_col.text_input("File name", placeholder="archive.db", label_visibility="collapsed")
+    if create_col.button("Create", width="stretch") and name:
+        try:
+            path = create_database(name)
+            st.success(f"Created `{os.path.basename(path)}`. Select it in the sidebar or query it as "
+                       f"an attached schema.")
+        except (WorkspaceError, sqlite3.Error, OSError) as e:
+            st.error(str(e))
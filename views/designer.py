@@ -0,0 +1,94 @@
+import sqlite3
+
+import streamlit as st
+
+from ingest import CHUNK_SIZE, UPLOAD_FORMATS, IngestError, load_upload, rows_per_sec
+from schema_catalog import get_schema_catalog
+from workspace import tables_changed
+
+
+# --- Page: Database Designer ---
+def render(pool):
+    schema_catalog = get_schema_catalog(pool.path)
+    st.markdown("<h1>Database Designer</h1>", unsafe_allow_html=True)
+
+    tabs = st.tabs(["Create Table", "Insert Data"])
+
+    # Tab 1: Create Table
+    with tabs[0]:
+        st.subheader("Create Table")
+        table_name = st.text_input("Table name:")
+        columns_input = st.text_area("Columns (e.g., id INTEGER PRIMARY KEY, name TEXT)")
+        if st.button("Create Table"):
+            if pool:
+                try:
+                    with pool.writer() as conn:
+                        conn.execute(f"CREATE TABLE {table_name} ({columns_input})")
+                    tables_changed(pool, [table_name])
+                    st.success(f"Table `{table_name}` created.")
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+    # Tab 2: Insert Data
+    with tabs[1]:
+        st.subheader("Insert Data")
+        if pool:
+            with pool.reader() as conn:
+                tables = schema_catalog.table_names(conn)
+            selected_table = st.selectbox("Choose table:", tables)
+
+            insert_mode = st.radio("Insert mode", ["Single record", "Bulk upload / paste"], horizontal=True)
+
+            if selected_table and insert_mode == "Bulk upload / paste":
+                with pool.reader() as conn:
+                    columns = schema_catalog.columns(conn, selected_table)
+                st.caption("Columns: " + ", ".join(f"{col.name} ({col.type or 'ANY'})" for col in columns))
+
+                data_format = st.selectbox("Format", list(UPLOAD_FORMATS))
+                uploaded = st.file_uploader("Upload a file", type=["csv", "tsv", "txt", "jsonl", "json"])
+                pasted = st.text_area("…or paste rows (first line is the header for CSV/TSV)", height=150)
+                batch_size = st.number_input("Rows per batch", min_value=100, max_value=100_000,
+                                             value=CHUNK_SIZE, step=500)
+
+                if st.button("Load Rows"):
+                    data = uploaded.getvalue() if uploaded is not None else pasted
+                    if not data:
+                        st.warning("Upload a file or paste some rows first.")
+                    else:
+                        progress = st.empty()
+                        try:
+                            # One transaction for the whole load: a bad row rolls everything back
+                            with pool.writer() as conn:
+                                report = load_upload(
+                                    conn, selected_table, data, data_format, int(batch_size),
+                                    on_chunk=lambda rows, secs: progress.caption(
+                                        f"{rows:,} rows loaded ({rows / max(secs, 1e-9):,.0f} rows/sec)…"),
+                                )
+                            tables_changed(pool, [selected_table])
+                            progress.empty()
+                            st.success(f"Inserted {report.rows:,} rows into `{selected_table}` in "
+                                       f"{report.seconds:.2f}s ({rows_per_sec(report):,.0f} rows/sec).")
+                        except (IngestError, sqlite3.Error, UnicodeDecodeError) as e:
+                            progress.empty()
+                            st.error(f"Nothing was inserted:\n\n{e}")
+
+            elif selected_table:
+                with pool.reader() as conn:
+                    columns = schema_catalog.columns(conn, selected_table)
+                values = []
+                for col in columns:
+                    val = st.text_input(f"{col.name} ({col.type})")
+                    values.append(val)
+
+                if st.button("Insert Record"):
+                    try:
+                        placeholders = ", ".join(["?"] * len(values))
+                        col_names = ", ".join([col.name for col in columns])
+                        with pool.writer() as conn:
+                            conn.execute(f"INSERT INTO {selected_table} ({col_names}) VALUES ({placeholders})", values)
+                        tables_changed(pool, [selected_table])
+                        st.success("Record inserted.")
+                    except Exception as e:
+                        st.error(f"Insertion failed: {e}")
+        else:
+            st.warning("Database connection not established.")
@@ -0,0 +1,80 @@
+import sqlite3
+import time
+
+import pandas as pd
+import streamlit as st
+
+from facets import FACETS, ensure_facets, fetch_tools, get_facet_index
+from grid import render_grid
+from similar import TOP_K, ensure_similar, fetch_similar, get_similar_index
+
+
+# --- Page: Explore Tools ---
+def render(pool):
+    facet_index = get_facet_index(pool.path)
+    st.markdown("<h1>Explore AI Tools</h1>", unsafe_allow_html=True)
+
+    if pool:
+        try:
+            ensure_facets(pool, facet_index)
+        except sqlite3.Error as e:
+            st.error(f"Facet index unavailable: {e}")
+        else:
+            # Counts depend on the other facets' selections, so read them before drawing the widgets
+            facet_labels = {"category": "Category", "tier": "Tier", "hashtag": "Hashtag", "rating": "Rating"}
+            selections = {facet: st.session_state.get(f"facet_{facet}", []) for facet in FACETS}
+            started = time.perf_counter()
+            counts, matched = facet_index.query(selections)
+            count_ms = (time.perf_counter() - started) * 1000
+
+            facet_cols = st.columns(len(FACETS))
+            for facet, col in zip(FACETS, facet_cols):
+                facet_counts = counts[facet]
+                options = sorted(set(facet_counts) | set(selections[facet]),
+                                 key=lambda v, c=facet_counts: (-c.get(v, 0), str(v)))
+                col.multiselect(facet_labels[facet], options, key=f"facet_{facet}",
+                                format_func=lambda v, c=facet_counts: f"{v} ({c.get(v, 0):,})")
+
+            rowids = None if matched == facet_index.all_rows else facet_index.rowids(matched)
+            with pool.reader() as conn:
+                tools = fetch_tools(conn, rowids)
+            st.caption(f"{matched.bit_count():,} tools match · facet counts in {count_ms:.2f} ms")
+            if tools:
+                render_grid(pd.DataFrame([t[1:] for t in tools],
+                                         columns=["Tool", "Category", "Tier", "Rating", "Upvotes", "Hashtags", "URL"]),
+                            caption=f"Top {len(tools):,} by upvotes")
+                render_tool_detail(pool, tools)
+            else:
+                st.info("No tools match the selected filters.")
+    else:
+        st.warning("Unable to connect to SQLite database.")
+
+
+def render_tool_detail(pool, tools):
+    """Details for one of ``tools`` and the tools most similar to it."""
+    st.markdown("<h3>Tool details</h3>", unsafe_allow_html=True)
+    choice = st.selectbox("Tool", range(len(tools)), format_func=lambda i: f"{tools[i][1]} · {tools[i][2]}")
+    rowid, title, category, tier, rating, upvotes, hashtags, url = tools[choice]
+    with pool.reader() as conn:
+        description = conn.execute("SELECT description FROM CategoryAI WHERE rowid = ?", (rowid,)).fetchone()
+    st.markdown(f"**[{title}]({url})** · {category} · {tier} · {rating or '–'} rating · {upvotes or 0} upvotes")
+    if description and description[0]:
+        st.write(description[0])
+    if hashtags:
+        st.caption(hashtags)
+
+    similar_index = get_similar_index(pool.path)
+    try:
+        ensure_similar(pool, similar_index)
+        with pool.reader() as conn:
+            similar = fetch_similar(conn, similar_index, rowid, TOP_K)
+    except sqlite3.Error as e:
+        st.error(f"Similar tools unavailable: {e}")
+        return
+    if similar:
+        render_grid(pd.DataFrame(similar, columns=["Tool", "Category", "Tier", "Rating", "Upvotes", "Hashtags",
+                                                   "URL", "Similarity"]),
+                    caption=f"Similar tools · cosine similarity over {similar_index.stats()['rows']:,} "
+                            f"TF-IDF vectors in {similar_index.query_ms:.2f} ms")
+    else:
+        st.caption("No similar tools found.")
@@ -0,0 +1,19 @@
+import streamlit as st
+
+
+# --- Page: Overview ---
+def render(pool):
+    st.markdown("<h1>AI Tools Directory Explorer</h1>", unsafe_allow_html=True)
+    st.markdown("""
+    Welcome to the **AI Tools Directory** - a streamlined interface built to manage and analyze data.
+
+    ### Application Workflow:
+    1. **Data Import**: Data is stored in a local SQLite database.
+    2. **Exploration**: This Streamlit dashboard connects to the SQLite DB offering:
+       - On-demand access to tables
+       - Ranked full-text search over AI tools
+       - Faceted browsing by category, tier, hashtag and rating
+       - SQL query execution
+       - Database Designer
+       - Dashboard analytics and insights
+    """)
@@ -0,0 +1,142 @@
+import sqlite3
+import time
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from analytics import (TOP_PER_CATEGORY, category_summary, refresh_if_due, refresh_status, set_refresh_interval,
+                       tier_counts, top_upvoted)
+from grid import render_grid
+from stats import ensure_stats, rating_counts, table_row_counts
+
+
+# --- Page: Analytics & Insights ---
+def render(pool):
+    st.markdown("<h1>Analytics & Insights</h1>", unsafe_allow_html=True)
+
+    if pool:
+        # Row counts are maintained by triggers; this only resyncs after schema changes
+        ensure_stats(pool)
+        with pool.reader() as conn:
+            row_counts = table_row_counts(conn)
+
+        # Display table overview
+        df_summary = pd.DataFrame(row_counts, columns=["Table", "Rows"]).sort_values(by="Rows", ascending=False)
+
+        st.markdown("<h3>Database Overview</h3>", unsafe_allow_html=True)
+        render_grid(df_summary)
+        col1, col2 = st.columns(2)
+
+    # Chart 1: Row count per table with custom styling
+    with col1:
+        st.markdown("**Row Count per Table**")
+        chart1 = alt.Chart(df_summary).mark_bar(
+            color="#14655B",
+            stroke="#14655B",
+            strokeWidth=2
+        ).encode(
+            x=alt.X('Table:N', sort='-y', title='Table'),
+            y=alt.Y('Rows:Q', title='Row Count'),
+            tooltip=['Table', 'Rows']
+        ).properties(
+            height=400,
+            width=400,
+            background='linear-gradient(to right, #002B36, #14655B, #64998d)'
+        )
+        st.altair_chart(chart1, width="stretch")
+
+    # Chart 2: Tools by Rating with custom styling
+    with col2:
+        st.markdown("**Tools by Rating (if available)**")
+        try:
+            with pool.reader() as conn:
+                rating_df = pd.DataFrame(rating_counts(conn), columns=["rating_stars", "count"])
+            if rating_df.empty:
+                raise LookupError("No rating statistics for CategoryAI")
+
+            rating_df = rating_df.sort_values(by='rating_stars', ascending=False)
+
+            chart2 = alt.Chart(rating_df).mark_bar(
+                color="#14655B",
+                stroke="#14655B",
+                strokeWidth=2
+            ).encode(
+                x=alt.X('rating_stars:N', title='Rating'),
+                y=alt.Y('count:Q', title='Count'),
+                tooltip=['rating_stars', 'count']
+            ).properties(
+                height=400,
+                width=400,
+                background='linear-gradient(to right, #002B36, #14655B, #64998d)'
+            )
+            st.altair_chart(chart2, width="stretch")
+
+        except Exception:
+            st.info("Rating data not available. Check CategoryAI table structure.")
+
+    # Category charts read only the materialized summaries, never CategoryAI itself
+    if pool:
+        st.markdown("<h3>Category Insights</h3>", unsafe_allow_html=True)
+        try:
+            refresh_if_due(pool)
+            with pool.reader() as conn:
+                df_categories = pd.DataFrame(category_summary(conn),
+                                             columns=["Category", "Tools", "Rated", "Mean rating", "Upvotes"])
+                df_tiers = pd.DataFrame(tier_counts(conn), columns=["Category", "Tier", "Tools"])
+                top_n = st.slider("Top tools by upvotes", 5, TOP_PER_CATEGORY, 10)
+                df_top = pd.DataFrame(top_upvoted(conn, top_n),
+                                      columns=["Tool", "Category", "Tier", "Upvotes", "URL"])
+                refresh_info = refresh_status(conn)
+        except sqlite3.Error as e:
+            st.info(f"Category summaries not available: {e}")
+            df_categories = pd.DataFrame()
+
+        if not df_categories.empty:
+            st.markdown("**Tools per Category and Tier**")
+            chart3 = alt.Chart(df_tiers).mark_bar().encode(
+                x=alt.X("Category:N", sort="-y", title="Category"),
+                y=alt.Y("sum(Tools):Q", title="Tools"),
+                color=alt.Color("Tier:N", scale=alt.Scale(scheme="tealblues")),
+                tooltip=["Category", "Tier", "Tools"],
+            ).properties(height=400)
+            st.altair_chart(chart3, width="stretch")
+
+            col3, col4 = st.columns(2)
+            with col3:
+                st.markdown("**Mean Rating per Category**")
+                chart4 = alt.Chart(df_categories).mark_bar(color="#14655B").encode(
+                    x=alt.X("Mean rating:Q", title="Mean rating score"),
+                    y=alt.Y("Category:N", sort="-x", title=None),
+                    tooltip=["Category", alt.Tooltip("Mean rating:Q", format=".2f"), "Rated"],
+                ).properties(height=max(300, 14 * len(df_categories)))
+                st.altair_chart(chart4, width="stretch")
+            with col4:
+                st.markdown("**Total Upvotes per Category**")
+                chart5 = alt.Chart(df_categories).mark_bar(color="#14655B").encode(
+                    x=alt.X("Upvotes:Q", title="Upvotes"),
+                    y=alt.Y("Category:N", sort="-x", title=None),
+                    tooltip=["Category", "Upvotes", "Tools"],
+                ).properties(height=max(300, 14 * len(df_categories)))
+                st.altair_chart(chart5, width="stretch")
+
+            st.markdown(f"**Top {top_n} Tools by Upvotes**")
+            render_grid(df_top)
+
+            with st.expander("Summary refresh"):
+                refreshed = refresh_info["refreshed_at"]
+                st.caption(
+                    f"Last refreshed {time.time() - refreshed:,.0f}s ago · "
+                    f"{refresh_info['last_refresh_categories']} categories in "
+                    f"{refresh_info['last_refresh_ms']:.1f} ms · "
+                    f"{refresh_info['pending_categories']} categories changed since"
+                    if refreshed else "Not refreshed yet."
+                )
+                interval = st.number_input("Refresh every (seconds)", min_value=1, max_value=86_400,
+                                           value=int(refresh_info["interval_s"]))
+                if interval != int(refresh_info["interval_s"]):
+                    with pool.writer() as conn:
+                        set_refresh_interval(conn, interval)
+                if st.button("Refresh now"):
+                    refresh_if_due(pool, force=True)
+                    st.rerun()
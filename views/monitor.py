@@ -0,0 +1,136 @@
+import sqlite3
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from cdc import recent_syncs
+from grid import render_grid
+from metrics import LATENCY_BUCKETS, registry
+from schema_catalog import get_schema_catalog
+from similar import get_similar_index
+
+
+# --- Page: Performance Monitor ---
+def render(pool):
+    schema_catalog = get_schema_catalog(pool.path)
+    st.markdown("<h1>Performance Monitor</h1>", unsafe_allow_html=True)
+
+    records = registry.snapshot()
+    if records:
+        df_queries = pd.DataFrame(records)
+        pages = sorted(df_queries["page"].unique())
+        page_filter = st.multiselect("Pages", pages, default=pages)
+        df_queries = df_queries[df_queries["page"].isin(page_filter)]
+
+        count_col, p50_col, p95_col, rows_col = st.columns(4)
+        count_col.metric("Statements", f"{len(df_queries):,}")
+        p50_col.metric("p50 latency", f"{df_queries['ms'].quantile(0.5):.2f} ms" if len(df_queries) else "–")
+        p95_col.metric("p95 latency", f"{df_queries['ms'].quantile(0.95):.2f} ms" if len(df_queries) else "–")
+        rows_col.metric("Rows returned", f"{int(df_queries['rows'].clip(lower=0).sum()):,}")
+
+        st.markdown("**Statement latency histogram**")
+        df_queries["latency_bucket"] = pd.cut(
+            df_queries["ms"], bins=[0] + [b * 1000 for b in LATENCY_BUCKETS] + [float("inf")],
+            labels=[f"≤{b * 1000:g} ms" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g} ms"],
+            include_lowest=True,
+        ).astype(str)
+        histogram = alt.Chart(df_queries).mark_bar(color="#14655B").encode(
+            x=alt.X("latency_bucket:N", sort=None, title="Latency"),
+            y=alt.Y("count():Q", title="Statements"),
+            color=alt.Color("page:N", title="Page"),
+            tooltip=["page", "count()"],
+        ).properties(height=300)
+        st.altair_chart(histogram, width="stretch")
+
+        st.markdown("**Slowest recent statements**")
+        render_grid(df_queries.nlargest(10, "ms")[["page", "ms", "rows", "sql"]])
+    else:
+        st.info("No statements recorded yet in this server process.")
+
+    reruns = []
+    for page, hist in registry.rerun_latency.items():
+        if not hist.count:
+            continue
+        first = registry.first_render.get(page)
+        first_ms = first.total / first.count * 1000 if first and first.count else None
+        import_ms = registry.page_imports[page] * 1000 if page in registry.page_imports else None
+        reruns.append((page, hist.count, hist.total / hist.count * 1000, first_ms, import_ms))
+    if reruns:
+        st.markdown("**Script rerun time by page**")
+        st.caption("First render is a session's first run; module import is the one-off cost of loading the page's "
+                   "module and its dependencies in this process.")
+        render_grid(pd.DataFrame(reruns, columns=["Page", "Reruns", "Mean ms", "First render ms", "Module import ms"])
+                    .sort_values("Mean ms", ascending=False))
+
+    replica_stats = pool.replica_stats() if pool else None
+    if replica_stats:
+        st.markdown("**Read replica** (reads served from an in-memory snapshot)")
+        age_col, stale_col, mem_col, sync_col = st.columns(4)
+        age_col.metric("Snapshot age", f"{replica_stats['age_s']:,.1f} s")
+        stale_col.metric("Staleness", f"{replica_stats['stale_s']:,.1f} s",
+                         "changes pending" if replica_stats["pending_changes"] else "in sync", delta_color="off")
+        mem_col.metric("Snapshot memory", f"{replica_stats['memory_bytes'] / 1024 ** 2:,.1f} MiB")
+        sync_col.metric("Last sync", f"{replica_stats['last_sync_ms']:,.1f} ms",
+                        f"{replica_stats['syncs']} syncs", delta_color="off")
+    elif pool:
+        st.caption("Reads are served from the database file. Set XPLORIA_READ_REPLICA=1 to serve them from an "
+                   "in-memory snapshot.")
+
+    if pool:
+        with pool.reader() as conn:
+            syncs = recent_syncs(conn)
+        if syncs:
+            st.markdown("**CSV syncs** (`python cdc.py`, most recent first)")
+            sync_df = pd.DataFrame(syncs, columns=["Sync", "Table", "Source", "Synced at", "Seconds", "Inserted",
+                                                   "Updated", "Deleted", "Unchanged"])
+            sync_df["Synced at"] = pd.to_datetime(sync_df["Synced at"], unit="s")
+            render_grid(sync_df)
+
+    catalog_stats = schema_catalog.stats()
+    st.caption(f"Schema catalog: {catalog_stats['tables']} tables at schema version "
+               f"{catalog_stats['schema_version']} · {catalog_stats['loads']} load(s), "
+               f"{catalog_stats['hits']:,} cached lookups")
+    if pool:
+        with st.expander("Internal tables"):
+            st.caption("Tables kept by SQLite, the full-text index and the app's triggers. They are hidden from "
+                       "the table viewer and designer; edit them only through the app.")
+            with pool.reader() as conn:
+                user_tables = set(schema_catalog.table_names(conn))
+                internal = [(name, schema_catalog.row_estimate(conn, name))
+                            for name in schema_catalog.table_names(conn, include_internal=True)
+                            if name not in user_tables]
+            render_grid(pd.DataFrame(internal, columns=["Table", "Rows (approx.)"]))
+    similar_stats = get_similar_index(pool.path).stats()
+    if similar_stats["rows"]:
+        st.caption(f"Similar-tools index: {similar_stats['rows']:,} vectors over {similar_stats['vocabulary']:,} "
+                   f"terms in {similar_stats['memory_bytes'] / 1024:,.0f} KiB "
+                   f"({'stored vectors' if similar_stats['from_store'] else 'built from rows'}) · last sync "
+                   f"{similar_stats['sync_ms']:.1f} ms, {similar_stats['rows_applied']:,} row(s) applied · "
+                   f"last lookup {similar_stats['query_ms']:.2f} ms")
+
+    st.markdown(f"**Slow-query log** (statements over {registry.slow_query_ms} ms)")
+    if pool:
+        top_n = st.slider("Show top", 5, 100, 20)
+        try:
+            with pool.reader() as conn:
+                slow_df = pd.read_sql_query(
+                    "SELECT datetime(logged_at, 'unixepoch') AS logged, page, duration_ms, rows, sql, plan "
+                    "FROM app_slow_queries ORDER BY duration_ms DESC LIMIT ?", conn, params=(top_n,))
+            for row in slow_df.itertuples():
+                with st.expander(f"{row.duration_ms:,.1f} ms · {row.page} · {row.sql[:80]}"):
+                    st.code(row.sql, language="sql")
+                    st.caption(f"Logged {row.logged} UTC · {row.rows} rows")
+                    if row.plan:
+                        st.code(row.plan, language="text")
+            if slow_df.empty:
+                st.caption("No slow statements logged.")
+        except (sqlite3.Error, pd.errors.DatabaseError):
+            st.caption("No slow statements logged.")
+
+    export_col, download_col = st.columns(2)
+    if export_col.button("Export Prometheus metrics"):
+        path = registry.export_prometheus()
+        st.success(f"Metrics written to `{path}`.")
+    download_col.download_button("Download metrics.prom", registry.prometheus_text(),
+                                 file_name="metrics.prom", mime="text/plain")
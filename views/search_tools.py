@@ -0,0 +1,48 @@
+import html
+import sqlite3
+
+import streamlit as st
+
+from search import ensure_search_index, filter_options, search_tools
+
+
+# --- Page: Search Tools ---
+def render(pool):
+    st.markdown("<h1>Search AI Tools</h1>", unsafe_allow_html=True)
+
+    if pool:
+        try:
+            ensure_search_index(pool)
+            with pool.reader() as conn:
+                options = filter_options(conn)
+        except sqlite3.Error as e:
+            st.error(f"Search index unavailable: {e}")
+            options = None
+
+        if options:
+            query_text = st.text_input("Search titles, descriptions, hashtags and categories:",
+                                       placeholder="e.g. email autom")
+            cat_col, tier_col, star_col = st.columns([2, 1, 1])
+            categories = cat_col.multiselect("Category", options["category"])
+            tiers = tier_col.multiselect("Tier", options["tier"])
+            min_stars = star_col.slider("Minimum rating stars", 0, 5, 0)
+
+            if query_text.strip():
+                with pool.reader() as conn:
+                    results, elapsed_ms = search_tools(conn, query_text, categories, tiers, min_stars)
+                st.caption(f"{len(results)} result(s) in {elapsed_ms:.1f} ms")
+
+                for row in results:
+                    st.markdown(f"""
+                        <div class="search-result">
+                            <a href="{html.escape(row['tool_url'] or '')}" style="color: #A7FFEB;"><b>{row['title_html']}</b></a>
+                            &nbsp;·&nbsp;{html.escape(row['category'] or '')} · {html.escape(row['tier'] or '')}
+                            · {'★' * int(row['rating_stars'] or 0)} · {row['upvotes'] or 0} upvotes
+                            <br>{row['snippet_html']}
+                            <br><small>{html.escape(row['hashtags'] or '')}</small>
+                        </div>
+                    """, unsafe_allow_html=True)
+                if not results:
+                    st.info("No tools match your search.")
+    else:
+        st.warning("Unable to connect to SQLite database.")
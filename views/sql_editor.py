@@ -0,0 +1,264 @@
+import pandas as pd
+import streamlit as st
+from streamlit_ace import st_ace
+
+from advisor import query_plan, suggest_indexes, time_query
+from db import quote_ident
+from grid import render_grid
+from query_cache import get_query_cache, track_tables
+from query_runner import (MAX_JOBS_PER_SESSION, MAX_ROWS, QUERY_TIMEOUT_S, QueryJob, ScriptError, get_query_executor,
+                          is_readonly_error, run_script, split_statements)
+from schema_catalog import get_schema_catalog
+from views.common import export_controls
+from workspace import tables_changed
+
+
+# --- Page: SQL Query Editor ---
+def render(pool):
+    query_cache = get_query_cache(pool.path)
+    query_executor = get_query_executor()
+    schema_catalog = get_schema_catalog(pool.path)
+    st.markdown("<h1>SQL Query Editor</h1>", unsafe_allow_html=True)
+    st.markdown("Write and run your custom SQL queries below:")
+
+    sql_input = st_ace(
+        placeholder="Write your SQL queries here...",
+        language="sql",
+        theme="dark",
+        font_size=16,
+        tab_size=4,
+        show_gutter=True,
+        show_print_margin=False,
+        wrap=True,
+        auto_update=True,
+        key="ace_editor",
+        min_lines=10,
+        height=200,
+    )
+
+
+    queries = split_statements(sql_input) if sql_input else []
+    if queries:
+        selected_query = st.selectbox("Select query to execute:", queries)
+
+        limit_col, rows_col = st.columns(2)
+        time_budget = limit_col.number_input("Time budget (seconds)", min_value=1, max_value=300,
+                                             value=QUERY_TIMEOUT_S)
+        max_rows = rows_col.number_input("Max rows", min_value=1, max_value=1_000_000,
+                                         value=MAX_ROWS, step=1000)
+
+        # Latest run per statement: a QueryJob, or a (sql, DataFrame) tuple for cache hits
+        query_runs = st.session_state.setdefault("query_runs", {})
+        running_jobs = [r for r in query_runs.values() if isinstance(r, QueryJob) and not r.done.is_set()]
+
+        if st.button("Execute Query"):
+            if pool:
+                cached_df = query_cache.get(selected_query, int(max_rows), pool.external_version())
+                if cached_df is None and len(running_jobs) >= MAX_JOBS_PER_SESSION:
+                    st.warning(f"{len(running_jobs)} queries are already running. "
+                               "Wait for one to finish or cancel it.")
+                else:
+                    query_runs.pop(selected_query, None)
+                    if cached_df is not None:
+                        query_runs[selected_query] = (selected_query, cached_df)
+                    else:
+                        # Runs on the shared worker pool so the page stays responsive
+                        job = QueryJob(selected_query, time_budget, int(max_rows)).submit(query_executor, pool)
+                        query_runs[selected_query] = job
+                        running_jobs.append(job)
+                    while len(query_runs) > 10:
+                        query_runs.pop(next(iter(query_runs)))
+            else:
+                st.warning("No database connection.")
+
+        with st.expander(f"Run all {len(queries)} statements in one transaction"):
+            continue_on_error = st.checkbox("Continue past failing statements (roll back only the failed one)")
+            if st.button("Run All") and pool:
+                try:
+                    with pool.writer() as conn, track_tables(conn) as access:
+                        script_results = run_script(conn, queries, time_budget, int(max_rows), continue_on_error)
+                    tables_changed(pool, access.written)
+                    st.session_state["script_run"] = (sql_input, script_results, None)
+                except ScriptError as e:
+                    st.session_state["script_run"] = (sql_input, e.results, str(e))
+
+            script_run = st.session_state.get("script_run")
+            if script_run and script_run[0] == sql_input:
+                _, script_results, script_error = script_run
+                if script_error:
+                    st.error(f"{script_error}. The whole script was rolled back.")
+                else:
+                    failed = sum(r.status == "failed" for r in script_results)
+                    total_ms = sum(r.elapsed for r in script_results) * 1000
+                    st.success(f"Committed {len(script_results) - failed} statement(s) in one transaction "
+                               f"({total_ms:.1f} ms)" + (f"; {failed} failed and were rolled back." if failed else "."))
+                render_grid(pd.DataFrame(
+                    [(i, r.status, round(r.elapsed * 1000, 2), r.rows, r.error or "", r.sql)
+                     for i, r in enumerate(script_results, start=1)],
+                    columns=["#", "Status", "ms", "Rows", "Error", "Statement"],
+                ))
+                last_select = next((r.result for r in reversed(script_results) if r.result and r.result.columns),
+                                   None)
+                if last_select is not None and not script_error:
+                    st.markdown("**Last result set**")
+                    render_grid(pd.DataFrame(last_select.rows, columns=last_select.columns))
+
+        if running_jobs:
+            @st.fragment(run_every=0.5)
+            def query_progress():
+                # A finished job needs a full rerun to render its result and index advice
+                if any(running.done.is_set() for running in running_jobs):
+                    st.rerun()
+                for running in running_jobs:
+                    info_col, cancel_col = st.columns([5, 1])
+                    info_col.caption(f"#{running.id} {running.status} · {running.rows_fetched:,} rows · "
+                                     f"{running.elapsed:.1f}s · `{running.sql[:80]}`")
+                    if cancel_col.button("Cancel", key=f"cancel_query_{running.id}"):
+                        running.cancel()
+                    if running.sql == selected_query and running.rows_fetched:
+                        preview = pd.DataFrame(running.partial_rows(100), columns=running.columns)
+                        render_grid(preview, caption=f"Partial result: first {len(preview)} of "
+                                                     f"{running.rows_fetched:,} rows fetched so far")
+
+            query_progress()
+
+        run = query_runs.get(selected_query)
+        job = run if isinstance(run, QueryJob) else None
+        result_df, from_cache, shown_sql = None, False, None
+
+        if job is not None and job.done.is_set():
+            if job.error is not None and not job.write and is_readonly_error(job.error):
+                # Readers are query_only, so a write is re-run on the writer with the same budget and cap
+                write_job = QueryJob(job.sql, job.timeout_s, job.max_rows, write=True).submit(query_executor, pool)
+                query_runs[selected_query] = write_job
+                st.rerun()
+            elif job.error is not None:
+                st.error(f"Execution error: {job.error}")
+            elif job.write and not job.result.columns:
+                if job.message is None:
+                    tables_changed(pool, job.written)
+                    if job.result.stopped == "timeout":
+                        job.message = ("warning", f"Statement stopped after its {job.timeout_s}s time budget; "
+                                                  "nothing was written.")
+                    elif job.result.stopped == "cancelled":
+                        job.message = ("warning", "Statement cancelled; nothing was written.")
+                    else:
+                        job.message = ("success", "Query executed (no result set).")
+                getattr(st, job.message[0])(job.message[1])
+            else:
+                result = job.result
+                result_df = pd.DataFrame(result.rows, columns=result.columns)
+                shown_sql = job.sql
+                if job.write and job.message is None and not result.stopped:
+                    # RETURNING rows of a write; never cached
+                    tables_changed(pool, job.written)
+                    job.message = ("success", f"Statement executed in {result.elapsed * 1000:.1f} ms.")
+                if result.stopped == "timeout":
+                    st.warning(f"Query stopped after its {job.timeout_s}s time budget; "
+                               f"showing the first {len(result.rows):,} rows.")
+                elif result.stopped == "cancelled":
+                    st.warning(f"Query cancelled; showing the first {len(result.rows):,} rows.")
+                elif result.truncated:
+                    st.warning(f"Result truncated to the first {job.max_rows:,} rows.")
+                elif job.message is None:
+                    query_cache.put(job.sql, result_df, job.tables, job.max_rows, job.data_version)
+                    job.message = ("success", f"Query executed successfully in {result.elapsed * 1000:.1f} ms.")
+        elif run is not None and job is None:
+            shown_sql, result_df, from_cache = run[0], run[1], True
+
+        if result_df is not None:
+            try:
+                render_grid(result_df)
+                if from_cache:
+                    st.success("Query served from cache.")
+                elif job.message:
+                    st.success(job.message[1])
+
+                advice = st.session_state.get("query_advice")
+                if advice is None or advice["run"] is not run:
+                    with pool.reader() as conn:
+                        plan = query_plan(conn, shown_sql, schema_catalog)
+                        st.session_state["query_advice"] = {
+                            "run": run,
+                            "sql": shown_sql,
+                            "plan": plan,
+                            "suggestions": suggest_indexes(conn, shown_sql, plan, schema_catalog),
+                            "timings": {},
+                        }
+            except Exception as e:
+                st.error(f"Execution error: {e}")
+
+        # Index advice survives reruns so a suggestion can be applied with one click
+        advice = st.session_state.get("query_advice")
+        if pool and advice and advice["sql"] == selected_query:
+            scans = [step for step in advice["plan"] if step.flag]
+            with st.expander(f"Query plan ({len(scans)} warning(s))", expanded=bool(advice["suggestions"])):
+                for step in advice["plan"]:
+                    marker = f" ⚠️ **{step.flag}**" if step.flag else ""
+                    st.markdown(f"`{step.detail}`{marker}")
+
+                for i, suggestion in enumerate(advice["suggestions"]):
+                    st.code(suggestion.sql, language="sql")
+                    st.caption(f"Suggested for {suggestion.table}: {suggestion.reason}")
+                    timing = advice["timings"].get(suggestion.sql)
+                    if timing:
+                        before_ms, after_ms = timing
+                        if before_ms is None or after_ms is None:
+                            st.success(f"Index applied. Timing skipped: the query did not finish within its "
+                                       f"{time_budget}s time budget.")
+                        else:
+                            st.success(f"Index applied: {before_ms:.2f} ms → {after_ms:.2f} ms "
+                                       f"({before_ms / max(after_ms, 1e-6):.1f}x)")
+                    elif st.button("Apply index", key=f"apply_index_{i}"):
+                        try:
+                            # Timed under the editor's budget and row cap, like the query itself
+                            with pool.reader() as conn:
+                                before_ms = time_query(conn, selected_query, timeout_s=time_budget,
+                                                       max_rows=int(max_rows))
+                            with pool.writer() as conn:
+                                conn.execute(suggestion.sql)
+                                conn.execute(f"ANALYZE {quote_ident(suggestion.table)}")
+                            with pool.reader() as conn:
+                                after_ms = time_query(conn, selected_query, timeout_s=time_budget,
+                                                      max_rows=int(max_rows)) if before_ms is not None else None
+                                advice["plan"] = query_plan(conn, selected_query, schema_catalog)
+                            advice["timings"][suggestion.sql] = (before_ms, after_ms)
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Could not apply index: {e}")
+
+                if not advice["suggestions"]:
+                    st.caption("No index suggestions for this query.")
+
+        if pool:
+            with st.expander("Export full result"):
+                st.caption("Streams every row of the selected query, ignoring the row cap.")
+                export_controls(pool, selected_query, "query_result", "query_export")
+
+        with st.expander("Result cache"):
+            cache_size = st.number_input("Max cached results", min_value=1, max_value=1024,
+                                         value=query_cache.max_entries, step=8)
+            if cache_size != query_cache.max_entries:
+                query_cache.resize(int(cache_size))
+            stats = query_cache.stats()
+            hit_col, miss_col, evict_col, size_col = st.columns(4)
+            hit_col.metric("Hits", stats["hits"], f"{stats['hit_rate']:.0%} hit rate", delta_color="off")
+            miss_col.metric("Misses", stats["misses"])
+            evict_col.metric("Evictions", stats["evictions"])
+            size_col.metric("Entries", f"{stats['entries']} / {stats['max_entries']}")
+            if st.button("Clear cache"):
+                query_cache.clear()
+                st.rerun()
+    else:
+        st.markdown("""
+    <div style="
+        background-color: rgba(14, 17, 23, 0.9);
+        color: white;
+        padding: 12px;
+        border-radius: 8px;
+        margin-top: 10px;
+        font-size: 16px;
+    ">
+        Enter SQL queries to execute.
+    </div>
+""", unsafe_allow_html=True)
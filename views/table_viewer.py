@@ -0,0 +1,61 @@
+import pandas as pd
+import streamlit as st
+
+from db import quote_ident
+from grid import render_grid
+from paging import DEFAULT_PAGE_SIZE, PAGE_SIZES, fetch_page
+from schema_catalog import get_schema_catalog
+from views.common import export_controls
+
+
+# --- Page: Database Tables ---
+def render(pool):
+    schema_catalog = get_schema_catalog(pool.path)
+    st.markdown("<h1>Database Table Viewer</h1>", unsafe_allow_html=True)
+
+    if pool:
+        with pool.reader() as conn:
+            tables = schema_catalog.table_names(conn)
+
+        if tables:
+            table_name = st.selectbox("Select a table", tables)
+
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+
+            # Only the current page's keyset anchor is kept between reruns
+            viewer = st.session_state.setdefault("table_viewer", {})
+            if st.button("Load Table Data"):
+                viewer.update(table=table_name, anchor=None, direction="next", page_no=1)
+
+            if viewer.get("table") == table_name:
+                try:
+                    with pool.reader() as conn:
+                        info = schema_catalog.table(conn, table_name)
+                        page = fetch_page(conn, table_name, page_size, viewer["anchor"], viewer["direction"],
+                                          rowid=info.has_rowid if info else None)
+                        total_rows = schema_catalog.row_estimate(conn, table_name)
+                    if not page.has_prev:
+                        viewer["page_no"] = 1
+                    df = pd.DataFrame(page.rows, columns=page.columns)
+
+                    total_pages = max(-(-total_rows // page_size), 1)
+                    render_grid(df, caption=f"Page {viewer['page_no']} of ~{total_pages} "
+                                            f"(~{total_rows:,} rows) from **{table_name}**")
+
+                    prev_col, next_col = st.columns(2)
+                    if prev_col.button("Previous", disabled=not page.has_prev, width="stretch"):
+                        viewer.update(anchor=page.first_key, direction="prev", page_no=max(viewer["page_no"] - 1, 1))
+                        st.rerun()
+                    if next_col.button("Next", disabled=not page.has_next, width="stretch"):
+                        viewer.update(anchor=page.last_key, direction="next", page_no=viewer["page_no"] + 1)
+                        st.rerun()
+
+                except Exception as e:
+                    st.error(f"Error fetching data: {e}")
+
+            with st.expander("Export table"):
+                export_controls(pool, f"SELECT * FROM {quote_ident(table_name)}", table_name, "table_export")
+        else:
+            st.warning("No tables found in database.")
+    else:
+        st.warning("Unable to connect to SQLite database.")
@@ -0,0 +1,165 @@
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict
+from urllib.request import pathname2url
+
+from db import DB_PATH
+from query_cache import get_query_cache
+from schema_catalog import get_schema_catalog
+
+# --- Workspace ---
+# Every SQLite file in the workspace directory can be opened from the
+# sidebar. The active file is the pool's main database. The others are
+# ATTACHed to each of its connections under an alias derived from the file
+# name, so one statement can join across files
+# (SELECT ... FROM main.CategoryAI JOIN shard_2.CategoryAI ...). Each file has
+# its own connection pool and its own result cache, schema catalog and facet
+# index. Writes go through the active file's writer.
+WORKSPACE_DIR = os.environ.get("XPLORIA_WORKSPACE", ".")
+DB_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+# SQLite allows 10 attached databases by default
+MAX_ATTACHED = 9
+MAINTENANCE_ACTIONS = {
+    "VACUUM": "VACUUM main",
+    "ANALYZE": "ANALYZE main",
+    "PRAGMA optimize": "PRAGMA main.optimize",
+}
+# Session state that describes the active database and is dropped when it changes
+SESSION_KEYS = ("query_runs", "script_run", "query_advice", "table_viewer", "exports")
+_RESERVED_ALIASES = {"main", "temp"}
+
+
+class WorkspaceError(Exception):
+    pass
+
+
+def discover(directory=WORKSPACE_DIR):
+    """Database files in ``directory``, with DB_PATH first."""
+    paths = []
+    if os.path.isdir(directory):
+        paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                       if name.lower().endswith(DB_EXTENSIONS) and os.path.isfile(os.path.join(directory, name)))
+    paths = [os.path.normpath(p) for p in paths]
+    default = os.path.normpath(DB_PATH)
+    return [default] + [p for p in paths if p != default]
+
+
+def schema_alias(path):
+    """A schema name for ``path``: the lower-cased file stem with non-word characters replaced."""
+    alias = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0]).lower() or "db"
+    if alias[0].isdigit() or alias in _RESERVED_ALIASES:
+        alias = f"db_{alias}"
+    return alias
+
+
+def attachments(active, paths):
+    """(alias, path) pairs for the files to ATTACH to ``active``'s connections."""
+    taken = {"main", "temp", schema_alias(active)}
+    pairs = []
+    for path in paths:
+        if os.path.normpath(path) == os.path.normpath(active):
+            continue
+        alias = base = schema_alias(path)
+        suffix = 2
+        while alias in taken:
+            alias, suffix = f"{base}_{suffix}", suffix + 1
+        taken.add(alias)
+        pairs.append((alias, os.path.abspath(path)))
+        if len(pairs) == MAX_ATTACHED:
+            break
+    return pairs
+
+
+def tables_changed(pool, tables):
+    """Drop cached results and row estimates for tables a write through ``pool`` touched.
+
+    ``tables`` may name tables of attached files as ``alias.table``. Other
+    files' caches store results read through ATTACH under their own alias
+    for the file, so the change is dropped there as well.
+    """
+    aliases = {alias.lower(): path for alias, path in pool.attached}
+    changed = defaultdict(set)  # absolute path -> table names
+    for table in tables:
+        alias, _, name = table.partition(".")
+        if name and alias.lower() in aliases:
+            changed[aliases[alias.lower()]].add(name)
+        else:
+            changed[os.path.abspath(pool.path)].add(table)
+    paths = discover()
+    for path in paths:
+        cache = get_query_cache(path)
+        own = changed.get(os.path.abspath(path))
+        if own:
+            cache.invalidate(own)
+            get_schema_catalog(path).invalidate_rows(own)
+        for alias, attached_path in attachments(path, paths):
+            cache.invalidate(f"{alias}.{table}" for table in changed.get(attached_path, ()))
+
+
+def create_database(name, directory=WORKSPACE_DIR):
+    """Create an empty WAL-mode database file in the workspace and return its path."""
+    name = name.strip()
+    if not re.fullmatch(r"[\w.-]+", name):
+        raise WorkspaceError("Use letters, digits, '_', '-' and '.' only")
+    if not name.lower().endswith(DB_EXTENSIONS):
+        name += ".db"
+    path = os.path.normpath(os.path.join(directory, name))
+    if os.path.exists(path):
+        raise WorkspaceError(f"{name} already exists")
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+    return path
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def database_stats(conn, path):
+    """Size and page figures for the main database of ``conn``, stored at ``path``."""
+    page_size = conn.execute("PRAGMA main.page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA main.page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+    tables = conn.execute("SELECT COUNT(*) FROM main.sqlite_master WHERE type='table'").fetchone()[0]
+    return {
+        "path": path,
+        "file_bytes": _file_size(path),
+        "wal_bytes": _file_size(f"{path}-wal"),
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "free_fraction": freelist / page_count if page_count else 0.0,
+        "tables": tables,
+    }
+
+
+def file_stats(path):
+    """database_stats for a workspace file, read through a short-lived read-only connection."""
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(path))}?mode=ro", uri=True)
+    try:
+        return database_stats(conn, path)
+    finally:
+        conn.close()
+
+
+def run_maintenance(pool, action):
+    """Run a MAINTENANCE_ACTIONS entry on ``pool``'s database; returns (seconds, bytes freed)."""
+    if action not in MAINTENANCE_ACTIONS:
+        raise WorkspaceError(f"Unknown maintenance action {action!r}")
+    before = _file_size(pool.path)
+    started = time.perf_counter()
+    with pool.writer() as conn:
+        conn.execute(MAINTENANCE_ACTIONS[action])
+    if action == "VACUUM":
+        # Fold the rewritten pages back into the file; a reader holding the WAL just delays this
+        with pool.writer() as conn:
+            conn.execute("PRAGMA main.wal_checkpoint(TRUNCATE)")
+    return time.perf_counter() - started, before - _file_size(pool.path)